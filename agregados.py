@@ -0,0 +1,296 @@
+import pandas as pd
+
+# Agregados materializados das vendas, mantidos na mesma transação que grava
+# o pedido no registro. O dashboard lê estes totais em vez de varrer as vendas.
+
+# Dimensão -> (tabela, coluna de venda usada como chave)
+DIMENSOES = {
+    "dia": ("agregados_dia", "Data da Compra"),
+    "categoria": ("agregados_categoria", "Categoria"),
+    "produto": ("agregados_produto", "Produto"),
+}
+
+# Partições por data: dimensão -> (tabela, coluna de venda), com chave (dia, valor).
+# A chave primária começa pelo dia, então uma janela de N dias lê só N partições
+PARTICOES = {
+    "produto": ("particao_dia_produto", "Produto"),
+    "categoria": ("particao_dia_categoria", "Categoria"),
+    "empresa": ("particao_dia_empresa", "Empresa"),
+}
+COLUNA_DATA = "Data da Compra"
+
+# Frequências da série temporal (regras do pandas); semanas começam na segunda
+FREQUENCIAS = {"dia": "D", "semana": "W-MON", "mes": "MS"}
+
+METRICAS = ["total_vendas", "total_encargos", "quantidade", "itens"]
+
+# Nomes usados na exibição
+ROTULOS = {
+    "total_vendas": "Total em Vendas (R$)",
+    "total_encargos": "Total de Encargos (R$)",
+    "quantidade": "Quantidade",
+    "itens": "Itens",
+    "lucro_liquido": "Lucro Líquido (R$)",
+}
+
+_METRICAS_SQL = """
+    total_vendas REAL NOT NULL DEFAULT 0,
+    total_encargos REAL NOT NULL DEFAULT 0,
+    quantidade INTEGER NOT NULL DEFAULT 0,
+    itens INTEGER NOT NULL DEFAULT 0
+"""
+
+
+def criar_tabelas(conexao):
+    conexao.execute(
+        f"CREATE TABLE IF NOT EXISTS agregados_totais (id INTEGER PRIMARY KEY CHECK (id = 1), {_METRICAS_SQL})"
+    )
+    for tabela, _ in DIMENSOES.values():
+        conexao.execute(f"CREATE TABLE IF NOT EXISTS {tabela} (chave TEXT PRIMARY KEY, {_METRICAS_SQL})")
+    for tabela, _ in PARTICOES.values():
+        conexao.execute(
+            f"CREATE TABLE IF NOT EXISTS {tabela} "
+            f"(dia TEXT NOT NULL, chave TEXT NOT NULL, {_METRICAS_SQL}, PRIMARY KEY (dia, chave)) WITHOUT ROWID"
+        )
+
+
+def _somar_por(df_vendas, coluna=None, por_dia=False):
+    df_metricas = pd.DataFrame({
+        "total_vendas": pd.to_numeric(df_vendas["Valor Total (R$)"], errors="coerce").fillna(0.0),
+        "total_encargos": pd.to_numeric(df_vendas["Encargo (R$)"], errors="coerce").fillna(0.0),
+        "quantidade": pd.to_numeric(df_vendas["Quantidade"], errors="coerce").fillna(0).astype("int64"),
+        "itens": 1,
+    })
+    if coluna is None:
+        return df_metricas.sum()
+    df_metricas["chave"] = df_vendas[coluna].fillna("").astype(str).to_numpy()
+    if por_dia:
+        df_metricas["dia"] = df_vendas[COLUNA_DATA].fillna("").astype(str).to_numpy()
+        return df_metricas.groupby(["dia", "chave"], sort=False).sum()
+    return df_metricas.groupby("chave", sort=False).sum()
+
+
+_UPSERT = """
+    INSERT INTO {tabela} ({chave}, total_vendas, total_encargos, quantidade, itens)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT({chave}) DO UPDATE SET
+        total_vendas = total_vendas + excluded.total_vendas,
+        total_encargos = total_encargos + excluded.total_encargos,
+        quantidade = quantidade + excluded.quantidade,
+        itens = itens + excluded.itens
+"""
+
+_UPSERT_PARTICAO = """
+    INSERT INTO {tabela} (dia, chave, total_vendas, total_encargos, quantidade, itens)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(dia, chave) DO UPDATE SET
+        total_vendas = total_vendas + excluded.total_vendas,
+        total_encargos = total_encargos + excluded.total_encargos,
+        quantidade = quantidade + excluded.quantidade,
+        itens = itens + excluded.itens
+"""
+
+
+def _somar(somas, chave, venda, encargo, quantidade):
+    soma = somas.get(chave)
+    if soma is None:
+        somas[chave] = [venda, encargo, quantidade, 1]
+    else:
+        soma[0] += venda
+        soma[1] += encargo
+        soma[2] += quantidade
+        soma[3] += 1
+
+
+def _acumular(pedidos):
+    # Soma em Python puro: para pedidos pequenos é bem mais rápido que groupby
+    totais = [0.0, 0.0, 0, 0]
+    grupos = {dimensao: {} for dimensao in DIMENSOES}
+    particoes = {dimensao: {} for dimensao in PARTICOES}
+    for df_pedido in pedidos:
+        vendas = pd.to_numeric(df_pedido["Valor Total (R$)"], errors="coerce").fillna(0.0).tolist()
+        encargos = pd.to_numeric(df_pedido["Encargo (R$)"], errors="coerce").fillna(0.0).tolist()
+        quantidades = pd.to_numeric(df_pedido["Quantidade"], errors="coerce").fillna(0).astype("int64").tolist()
+        metricas = list(zip(vendas, encargos, quantidades))
+
+        totais[0] += sum(vendas)
+        totais[1] += sum(encargos)
+        totais[2] += sum(quantidades)
+        totais[3] += len(metricas)
+        for dimensao, (_, coluna) in DIMENSOES.items():
+            somas = grupos[dimensao]
+            chaves = df_pedido[coluna].fillna("").astype(str).tolist()
+            for chave, (venda, encargo, quantidade) in zip(chaves, metricas):
+                _somar(somas, chave, venda, encargo, quantidade)
+        dias = df_pedido[COLUNA_DATA].fillna("").astype(str).tolist()
+        for dimensao, (_, coluna) in PARTICOES.items():
+            somas = particoes[dimensao]
+            chaves = zip(dias, df_pedido[coluna].fillna("").astype(str).tolist())
+            for chave, (venda, encargo, quantidade) in zip(chaves, metricas):
+                _somar(somas, chave, venda, encargo, quantidade)
+    return totais, grupos, particoes
+
+
+def atualizar(cursor, pedidos):
+    # Custo proporcional ao tamanho dos pedidos, não ao histórico de vendas
+    totais, grupos, particoes = _acumular(pedidos)
+    cursor.execute(_UPSERT.format(tabela="agregados_totais", chave="id"), (1, *totais))
+    for dimensao, (tabela, _) in DIMENSOES.items():
+        cursor.executemany(
+            _UPSERT.format(tabela=tabela, chave="chave"),
+            ((chave, *soma) for chave, soma in grupos[dimensao].items()),
+        )
+    for dimensao, (tabela, _) in PARTICOES.items():
+        cursor.executemany(
+            _UPSERT_PARTICAO.format(tabela=tabela),
+            ((dia, chave, *soma) for (dia, chave), soma in particoes[dimensao].items()),
+        )
+
+
+def reconstruir(cursor):
+    # Recalcula tudo a partir das vendas; usado só para reparo ou migração
+    cursor.execute("DELETE FROM agregados_totais")
+    cursor.execute(
+        "INSERT INTO agregados_totais (id, total_vendas, total_encargos, quantidade, itens) "
+        'SELECT 1, COALESCE(SUM("Valor Total (R$)"), 0), COALESCE(SUM("Encargo (R$)"), 0), '
+        'COALESCE(SUM("Quantidade"), 0), COUNT(*) FROM vendas'
+    )
+    for tabela, coluna in DIMENSOES.values():
+        cursor.execute(f"DELETE FROM {tabela}")
+        cursor.execute(
+            f"INSERT INTO {tabela} (chave, total_vendas, total_encargos, quantidade, itens) "
+            f'SELECT COALESCE("{coluna}", \'\'), SUM("Valor Total (R$)"), SUM("Encargo (R$)"), SUM("Quantidade"), COUNT(*) '
+            f'FROM vendas GROUP BY COALESCE("{coluna}", \'\')'
+        )
+    reconstruir_particoes(cursor)
+
+
+def reconstruir_particoes(cursor):
+    for tabela, coluna in PARTICOES.values():
+        cursor.execute(f"DELETE FROM {tabela}")
+        cursor.execute(
+            f"INSERT INTO {tabela} (dia, chave, total_vendas, total_encargos, quantidade, itens) "
+            f'SELECT "{COLUNA_DATA}", COALESCE("{coluna}", \'\'), SUM("Valor Total (R$)"), SUM("Encargo (R$)"), '
+            f'SUM("Quantidade"), COUNT(*) FROM vendas GROUP BY "{COLUNA_DATA}", COALESCE("{coluna}", \'\')'
+        )
+
+
+def _com_lucro(df_agregado):
+    df_agregado["lucro_liquido"] = df_agregado["total_vendas"] - df_agregado["total_encargos"]
+    return df_agregado
+
+
+def resumir(df_vendas):
+    # Mesmo formato dos agregados do registro, para vendas fora dele (CSVs antigos)
+    if df_vendas.empty:
+        totais = dict.fromkeys(METRICAS, 0)
+    else:
+        totais = dict(zip(METRICAS, _somar_por(df_vendas)[METRICAS].tolist()))
+    totais["lucro_liquido"] = totais["total_vendas"] - totais["total_encargos"]
+
+    dimensoes = {}
+    for dimensao, (_, coluna) in DIMENSOES.items():
+        if df_vendas.empty:
+            df_agregado = pd.DataFrame(columns=METRICAS, dtype="float64")
+        else:
+            df_agregado = _somar_por(df_vendas, coluna)[METRICAS]
+        df_agregado.index.name = coluna
+        dimensoes[dimensao] = _com_lucro(df_agregado)
+
+    # Mesmo recorte das partições do registro: índice (dia, chave), ordenado por dia
+    particoes = {}
+    for dimensao, (_, coluna) in PARTICOES.items():
+        if df_vendas.empty:
+            indice = pd.MultiIndex.from_arrays([[], []], names=["dia", coluna])
+            df_particao = pd.DataFrame(columns=METRICAS, index=indice, dtype="float64")
+        else:
+            df_particao = _somar_por(df_vendas, coluna, por_dia=True)[METRICAS].sort_index()
+            df_particao.index.names = ["dia", coluna]
+        particoes[dimensao] = df_particao
+    return totais, dimensoes, particoes
+
+
+def combinar_totais(*lista_totais):
+    return {chave: sum(totais[chave] for totais in lista_totais) for chave in lista_totais[0]}
+
+
+def combinar_dimensao(*lista_agregados):
+    df_agregado = pd.concat(lista_agregados)
+    nome_indice = df_agregado.index.name
+    df_agregado = df_agregado.groupby(level=0).sum()
+    df_agregado.index.name = nome_indice
+    return df_agregado
+
+
+def ler_totais(conexao):
+    linha = conexao.execute(f"SELECT {', '.join(METRICAS)} FROM agregados_totais WHERE id = 1").fetchone()
+    if linha is None:
+        linha = (0.0, 0.0, 0, 0)
+    totais = dict(zip(METRICAS, linha))
+    totais["lucro_liquido"] = totais["total_vendas"] - totais["total_encargos"]
+    return totais
+
+
+def ler_dimensao(conexao, dimensao):
+    tabela, coluna = DIMENSOES[dimensao]
+    df_agregado = pd.read_sql_query(f"SELECT chave, {', '.join(METRICAS)} FROM {tabela} ORDER BY chave", conexao)
+    return _com_lucro(df_agregado.rename(columns={"chave": coluna}).set_index(coluna))
+
+
+def filtro_periodo(coluna, desde, ate):
+    condicoes = []
+    parametros = []
+    if desde is not None:
+        condicoes.append(f"{coluna} >= ?")
+        parametros.append(desde)
+    if ate is not None:
+        condicoes.append(f"{coluna} <= ?")
+        parametros.append(ate)
+    return (" WHERE " + " AND ".join(condicoes) if condicoes else ""), parametros
+
+
+def ler_serie(conexao, desde=None, ate=None):
+    # Totais por dia no intervalo [desde, ate] (datas ISO), lidos pela chave do dia
+    tabela, coluna = DIMENSOES["dia"]
+    filtro, parametros = filtro_periodo("chave", desde, ate)
+    df_serie = pd.read_sql_query(
+        f"SELECT chave, {', '.join(METRICAS)} FROM {tabela}{filtro} ORDER BY chave", conexao, params=parametros
+    )
+    return _com_lucro(df_serie.rename(columns={"chave": coluna}).set_index(coluna))
+
+
+def ler_periodo(conexao, dimensao, desde=None, ate=None):
+    # Sem período, os agregados gerais já respondem; com período, só as partições dos dias pedidos
+    if desde is None and ate is None and dimensao in DIMENSOES:
+        return ler_dimensao(conexao, dimensao)
+    tabela, coluna = PARTICOES[dimensao]
+    filtro, parametros = filtro_periodo("dia", desde, ate)
+    somas = ", ".join(f"SUM({metrica}) AS {metrica}" for metrica in METRICAS)
+    df_agregado = pd.read_sql_query(
+        f"SELECT chave, {somas} FROM {tabela}{filtro} GROUP BY chave ORDER BY chave", conexao, params=parametros
+    )
+    return _com_lucro(df_agregado.rename(columns={"chave": coluna}).set_index(coluna))
+
+
+def recortar_serie(df_serie, desde=None, ate=None):
+    # Equivalente de ler_serie para agregados em memória (vendas antigas)
+    return df_serie.sort_index().loc[desde:ate] if len(df_serie) else df_serie
+
+
+def recortar_particao(df_particao, desde=None, ate=None):
+    # Equivalente de ler_periodo para as partições em memória (vendas antigas)
+    coluna = df_particao.index.names[1]
+    df_agregado = df_particao.loc[desde:ate] if len(df_particao) else df_particao
+    df_agregado = df_agregado.groupby(level=1).sum()
+    df_agregado.index.name = coluna
+    return _com_lucro(df_agregado)
+
+
+def agrupar_serie(df_serie, frequencia="dia"):
+    # Série diária reagrupada por semana ou mês; o índice vira data
+    if df_serie.empty:
+        return df_serie
+    df_serie = df_serie.copy()
+    df_serie.index = pd.to_datetime(df_serie.index, errors="coerce")
+    df_serie = df_serie[df_serie.index.notna()]
+    return _com_lucro(df_serie[METRICAS].resample(FREQUENCIAS[frequencia], label="left", closed="left").sum())
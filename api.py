@@ -0,0 +1,249 @@
+import asyncio
+import json
+import logging
+import os
+from urllib.parse import parse_qs
+
+from carrinho import Carrinho
+from catalogo import carregar_catalogo
+from estoque import EstoqueInsuficiente, abrir_estoque
+from fornecedores import PARAMETRO_URL, carregar_fornecedores
+from instrumentacao import Medicao, obter_metricas
+from moeda import para_centavos, para_reais
+from pedido import ENCARGO_PERCENTUAL, QUANTIDADE_MAXIMA, VALOR_MAXIMO_CENTAVOS, montar_pedido
+from registro_vendas import abrir_registro
+
+# API HTTP (ASGI) para pedidos de sistemas parceiros, sem passar pelo Streamlit.
+# Usa o mesmo catálogo e o mesmo registro de vendas do app (servicos.py); o
+# fornecedor vem da URL como no app (POST /pedidos?fornecedor=2a) ou é o padrão.
+# Execução: uvicorn api:app
+
+_log = logging.getLogger(__name__)
+
+TAMANHO_MAXIMO_CORPO = 10 * 1024 * 1024
+MAXIMO_PEDIDOS_POR_LOTE = 1000
+
+
+class ErroRequisicao(Exception):
+    def __init__(self, status, mensagem, erros=None):
+        super().__init__(mensagem)
+        self.status = status
+        self.mensagem = mensagem
+        self.erros = erros or []
+
+
+def validar_pedido(dados, catalogo, posicao=0, encargo_percentual=ENCARGO_PERCENTUAL):
+    erros = []
+    if not isinstance(dados, dict):
+        raise ErroRequisicao(422, "Pedido inválido.", [f"pedidos[{posicao}]: esperado um objeto"])
+
+    comprador = dados.get("comprador")
+    dados_comprador = {}
+    if not isinstance(comprador, dict):
+        erros.append(f"pedidos[{posicao}].comprador: esperado um objeto")
+    else:
+        for campo in ("nome", "empresa", "email"):
+            valor = comprador.get(campo)
+            if not isinstance(valor, str) or not valor.strip():
+                erros.append(f"pedidos[{posicao}].comprador.{campo}: obrigatório (texto)")
+            else:
+                dados_comprador[campo] = valor.strip()
+
+    itens = dados.get("itens")
+    if not isinstance(itens, list) or not itens:
+        erros.append(f"pedidos[{posicao}].itens: informe ao menos um item")
+        itens = []
+
+    # O carrinho junta itens repetidos do mesmo produto
+    carrinho = Carrinho()
+    for i, item in enumerate(itens):
+        local = f"pedidos[{posicao}].itens[{i}]"
+        if not isinstance(item, dict):
+            erros.append(f"{local}: esperado um objeto")
+            continue
+        produto = item.get("produto")
+        quantidade = item.get("quantidade")
+        if not isinstance(produto, str):
+            erros.append(f"{local}.produto: deve ser o nome do produto (texto)")
+            continue
+        if produto not in catalogo:
+            erros.append(f"{local}.produto: produto desconhecido: {produto!r}")
+            continue
+        if not isinstance(quantidade, int) or isinstance(quantidade, bool) or quantidade <= 0:
+            erros.append(f"{local}.quantidade: deve ser um inteiro positivo")
+            continue
+        # Itens repetidos somam no carrinho: o limite vale para o total do produto
+        if carrinho.quantidade(produto) + quantidade > QUANTIDADE_MAXIMA:
+            erros.append(f"{local}.quantidade: máximo de {QUANTIDADE_MAXIMA} unidades por produto")
+            continue
+        info = catalogo.produto(produto)
+        unitario = para_centavos(info["Preço Final c/ Impostos (R$)"])
+        if (carrinho.quantidade(produto) + quantidade) * unitario > VALOR_MAXIMO_CENTAVOS:
+            erros.append(f"{local}.quantidade: valor total do item acima do limite")
+            continue
+        carrinho.adicionar(produto, info["Categoria"], quantidade, unitario)
+
+    if erros:
+        return None, erros
+    return montar_pedido(
+        carrinho.colunas(),
+        dados_comprador["nome"],
+        dados_comprador["empresa"],
+        dados_comprador["email"],
+        encargo_percentual,
+    ), []
+
+
+def obter_fornecedor(chave=None):
+    fornecedores = carregar_fornecedores()
+    try:
+        fornecedor = fornecedores.obter(chave)
+    except ValueError as e:
+        raise ErroRequisicao(404, str(e))
+    # Só marca o acesso: os caches da API são os do catálogo e das conexões
+    fornecedores.registrar_acesso(fornecedor)
+    return fornecedor
+
+
+def processar_pedidos(corpo, fornecedor=None):
+    # Aceita um pedido ({"comprador": ..., "itens": ...}) ou um lote ({"pedidos": [...]})
+    if isinstance(corpo, dict) and "pedidos" in corpo:
+        pedidos = corpo["pedidos"]
+    else:
+        pedidos = [corpo]
+    if not isinstance(pedidos, list) or not pedidos:
+        raise ErroRequisicao(422, "Nenhum pedido informado.")
+    if len(pedidos) > MAXIMO_PEDIDOS_POR_LOTE:
+        raise ErroRequisicao(413, f"Máximo de {MAXIMO_PEDIDOS_POR_LOTE} pedidos por requisição.")
+
+    fornecedor = fornecedor or obter_fornecedor()
+    medicao = Medicao(obter_metricas())
+    with medicao.etapa("api_validacao"):
+        catalogo = carregar_catalogo(fornecedor.produtos_path)
+        validados = []
+        erros = []
+        for posicao, dados in enumerate(pedidos):
+            df_pedido, erros_pedido = validar_pedido(dados, catalogo, posicao, fornecedor.encargo_percentual)
+            validados.append(df_pedido)
+            erros.extend(erros_pedido)
+    if erros:
+        raise ErroRequisicao(422, "Pedido com erros de validação.", erros)
+
+    # Baixa do estoque do lote inteiro de uma vez; desfeita se a gravação falhar
+    itens = [item for df_pedido in validados for item in zip(df_pedido["Produto"], df_pedido["Quantidade"])]
+    estoque = abrir_estoque(fornecedor.estoque_db_path)
+    with medicao.etapa("api_estoque"):
+        try:
+            estoque.confirmar(None, itens)
+        except EstoqueInsuficiente as e:
+            raise ErroRequisicao(409, str(e), [f"{e.produto}: {e.disponivel} disponível(is)"])
+
+    # O lote inteiro entra numa única transação: ou todos os pedidos ou nenhum
+    with medicao.etapa("api_registro"):
+        try:
+            ids = abrir_registro(fornecedor.vendas_db_path).registrar_pedidos(validados)
+        except Exception:
+            estoque.devolver(itens)
+            raise
+    medicao.concluir_requisicao()
+    return [
+        {
+            "id": id_pedido,
+            "itens": len(df_pedido),
+            "total": para_reais(int(para_centavos(df_pedido["Valor Total (R$)"]).sum())),
+            "encargo": para_reais(int(para_centavos(df_pedido["Encargo (R$)"]).sum())),
+        }
+        for id_pedido, df_pedido in zip(ids, validados)
+    ]
+
+
+async def _ler_corpo(receive):
+    partes = []
+    tamanho = 0
+    while True:
+        mensagem = await receive()
+        parte = mensagem.get("body", b"")
+        tamanho += len(parte)
+        if tamanho > TAMANHO_MAXIMO_CORPO:
+            raise ErroRequisicao(413, "Corpo da requisição muito grande.")
+        partes.append(parte)
+        if not mensagem.get("more_body", False):
+            return b"".join(partes)
+
+
+async def _responder(send, status, dados, tipo=b"application/json; charset=utf-8"):
+    corpo = dados.encode("utf-8") if isinstance(dados, str) else json.dumps(dados, ensure_ascii=False).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", tipo),
+            (b"content-length", str(len(corpo)).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": corpo})
+
+
+async def _tratar_http(scope, receive, send):
+    metodo = scope["method"]
+    caminho = scope["path"].rstrip("/") or "/"
+
+    if caminho == "/saude" and metodo == "GET":
+        return await _responder(send, 200, {"status": "ok"})
+
+    if caminho == "/metrics" and metodo == "GET":
+        return await _responder(send, 200, obter_metricas().prometheus(), b"text/plain; version=0.0.4; charset=utf-8")
+
+    if caminho == "/pedidos":
+        if metodo != "POST":
+            return await _responder(send, 405, {"erro": "Método não permitido."})
+        corpo = await _ler_corpo(receive)
+        try:
+            dados = json.loads(corpo)
+        except ValueError:
+            raise ErroRequisicao(400, "JSON inválido.")
+        parametros = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        fornecedor = obter_fornecedor(parametros.get(PARAMETRO_URL, [None])[0])
+        # Validação e gravação fora do loop de eventos (o SQLite bloqueia)
+        pedidos = await asyncio.to_thread(processar_pedidos, dados, fornecedor)
+        return await _responder(send, 201, {"pedidos": pedidos})
+
+    return await _responder(send, 404, {"erro": "Rota não encontrada."})
+
+
+async def _tratar_ciclo_de_vida(receive, send):
+    while True:
+        mensagem = await receive()
+        if mensagem["type"] == "lifespan.startup":
+            # Carrega o catálogo e abre o registro do fornecedor padrão antes da
+            # primeira requisição; os outros abrem no primeiro pedido
+            fornecedor = obter_fornecedor()
+            carregar_catalogo(fornecedor.produtos_path)
+            abrir_registro(fornecedor.vendas_db_path)
+            abrir_estoque(fornecedor.estoque_db_path)
+            await send({"type": "lifespan.startup.complete"})
+        elif mensagem["type"] == "lifespan.shutdown":
+            for fornecedor in carregar_fornecedores().por_chave.values():
+                if os.path.exists(fornecedor.vendas_db_path):
+                    abrir_registro(fornecedor.vendas_db_path).sincronizar()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        return await _tratar_ciclo_de_vida(receive, send)
+    if scope["type"] != "http":
+        return
+
+    try:
+        await _tratar_http(scope, receive, send)
+    except ErroRequisicao as e:
+        resposta = {"erro": e.mensagem}
+        if e.erros:
+            resposta["erros"] = e.erros
+        await _responder(send, e.status, resposta)
+    except Exception:
+        # Detalhes só no log do servidor; o cliente recebe uma mensagem fixa
+        _log.exception("Erro ao processar %s %s", scope.get("method"), scope.get("path"))
+        await _responder(send, 500, {"erro": "Erro interno ao registrar pedidos."})
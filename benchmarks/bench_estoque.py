@@ -0,0 +1,118 @@
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from estoque import Estoque, EstoqueInsuficiente
+
+# Vários processos com várias sessões cada reservando e finalizando pedidos
+# sobre poucos produtos concorridos. No fim, o estoque precisa bater exatamente
+# com o que foi vendido: nenhuma baixa perdida e nenhum produto negativo.
+# Uso: python benchmarks/bench_estoque.py --processos 4 --sessoes 8 --pedidos 200
+
+
+def _sessao(caminho_db, id_sessao, pedidos, produtos, vendidos, recusados, trava):
+    estoque = Estoque(caminho_db)
+    gerador = random.Random(id_sessao)
+    meus_vendidos = Counter()
+    minhas_recusas = 0
+    for _ in range(pedidos):
+        itens = Counter({gerador.choice(produtos): gerador.randint(1, 3) for _ in range(gerador.randint(1, 3))})
+        try:
+            for produto, quantidade in itens.items():
+                estoque.reservar(id_sessao, produto, quantidade)
+            estoque.confirmar(id_sessao, list(itens.items()))
+            meus_vendidos.update(itens)
+        except EstoqueInsuficiente:
+            estoque.liberar(id_sessao)
+            minhas_recusas += 1
+    estoque.fechar()
+    with trava:
+        vendidos.update(meus_vendidos)
+        recusados[0] += minhas_recusas
+
+
+def _processo(caminho_db, indice, sessoes, pedidos, produtos, fila):
+    vendidos = Counter()
+    recusados = [0]
+    trava = threading.Lock()
+    threads = [
+        threading.Thread(target=_sessao, args=(caminho_db, f"p{indice}s{i}", pedidos, produtos, vendidos, recusados, trava))
+        for i in range(sessoes)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    fila.put((dict(vendidos), recusados[0]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vazão e consistência das baixas de estoque concorrentes")
+    parser.add_argument("--processos", type=int, default=4)
+    parser.add_argument("--sessoes", type=int, default=8, help="sessões (threads) por processo")
+    parser.add_argument("--pedidos", type=int, default=100, help="pedidos por sessão")
+    parser.add_argument("--produtos", type=int, default=20)
+    parser.add_argument("--estoque-inicial", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho_db = os.path.join(pasta, "estoque.db")
+        produtos = [f"Produto {i}" for i in range(args.produtos)]
+        estoque = Estoque(caminho_db)
+        estoque.definir_estoque((produto, args.estoque_inicial) for produto in produtos)
+
+        fila = multiprocessing.Queue()
+        processos = [
+            multiprocessing.Process(target=_processo, args=(caminho_db, i, args.sessoes, args.pedidos, produtos, fila))
+            for i in range(args.processos)
+        ]
+        inicio = time.perf_counter()
+        for processo in processos:
+            processo.start()
+        resultados = [fila.get() for _ in processos]
+        for processo in processos:
+            processo.join()
+        duracao = time.perf_counter() - inicio
+
+        vendidos = Counter()
+        recusados = 0
+        for vendidos_processo, recusados_processo in resultados:
+            vendidos.update(vendidos_processo)
+            recusados += recusados_processo
+
+        df_estoque = estoque.ler_estoque().set_index("Produto")
+        estoque.fechar()
+
+    pedidos = args.processos * args.sessoes * args.pedidos
+    finalizados = pedidos - recusados
+    print(f"{pedidos} pedidos em {duracao:.2f} s ({args.processos} processos x {args.sessoes} sessões)")
+    print(f"finalizados: {finalizados} ({finalizados / duracao:.0f}/s), recusados por falta de estoque: {recusados}")
+
+    erros = []
+    for produto in produtos:
+        esperado = args.estoque_inicial - vendidos[produto]
+        linha = df_estoque.loc[produto]
+        if linha["Estoque"] != esperado:
+            erros.append(f"{produto}: estoque {linha['Estoque']}, esperado {esperado}")
+        if linha["Reservado"] != 0:
+            erros.append(f"{produto}: {linha['Reservado']} ainda reservado")
+        if linha["Estoque"] < 0:
+            erros.append(f"{produto}: estoque negativo")
+    if erros:
+        print("INCONSISTENTE:")
+        for erro in erros:
+            print(f"  {erro}")
+        sys.exit(1)
+    print(f"consistente: {sum(vendidos.values())} unidades vendidas, nenhuma baixa perdida")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from executar import versao_git
+
+# Teste de carga local das páginas do app com o AppTest do Streamlit: N sessões
+# simuladas por processo abrem a loja, escolhem produtos, adicionam ao
+# carrinho, removem um item pelo editor_remocao e finalizam o pedido; uma parte
+# das sessões abre o dashboard. O AppTest não roda em várias threads (o
+# Runtime é global), então as sessões de um processo se revezam rerun a rerun,
+# todas abertas ao mesmo tempo; o paralelismo real vem de --processos, como
+# vários workers sobre os mesmos arquivos. Os dados são uma cópia do database/
+# numa pasta temporária: nada do projeto é alterado.
+# Uso:
+#   python benchmarks/carga_app.py --sessoes 8 --processos 2
+#   python benchmarks/carga_app.py --sessoes 16 --comparar benchmarks/resultados/carga_<commit>.json
+
+APP = os.path.join(RAIZ, "main.py")
+PAGINA_DASHBOARD = "paginas/dashboard.py"
+PERCENTIS = (50, 95, 99)
+# Versão do Streamlit em que a remoção pelo editor_remocao foi validada: ela usa
+# partes internas do AppTest (_tree.get_widget_states e _run), sem garantia entre versões
+STREAMLIT_TESTADO = "1.65"
+LIMITE_REGRESSAO = 1.25
+
+
+def _memoria_rss():
+    # Memória residente do processo (Linux); 0 quando indisponível
+    try:
+        with open("/proc/self/status", encoding="ascii") as arquivo:
+            for linha in arquivo:
+                if linha.startswith("VmRSS:"):
+                    return int(linha.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+def preparar_dados(pasta, produtos=None):
+    # Cópia do catálogo e das vendas antigas; com --produtos, catálogo sintético
+    from gerador_catalogo import gerar_arquivos
+
+    pasta_produtos = os.path.join(pasta, "database", "produtos")
+    pasta_vendas = os.path.join(pasta, "database", "vendas")
+    os.makedirs(pasta_produtos)
+    os.makedirs(pasta_vendas)
+    catalogo = os.path.join(pasta_produtos, "produtos_completos_formatado.csv")
+    if produtos:
+        gerar_arquivos(produtos, catalogo, "ambos")
+    else:
+        shutil.copy(os.path.join(RAIZ, "database", "produtos", "produtos_completos_formatado.csv"), catalogo)
+    origem_vendas = os.path.join(RAIZ, "database", "vendas")
+    for nome in os.listdir(origem_vendas):
+        if nome.endswith(".csv"):
+            shutil.copy(os.path.join(origem_vendas, nome), pasta_vendas)
+
+
+def verificar_apptest():
+    # Falha antes de começar se as partes internas do AppTest usadas aqui não existirem
+    import streamlit
+    from streamlit.testing.v1 import AppTest
+    from streamlit.testing.v1.element_tree import ElementTree
+
+    faltando = [
+        nome for nome, existe in (
+            ("AppTest._run", hasattr(AppTest, "_run")),
+            ("ElementTree.get_widget_states", hasattr(ElementTree, "get_widget_states")),
+        ) if not existe
+    ]
+    if faltando:
+        raise SystemExit(
+            f"Streamlit {streamlit.__version__} não tem {', '.join(faltando)}, usados para remover itens pelo "
+            f"editor_remocao no AppTest. O teste de carga foi validado com o Streamlit {STREAMLIT_TESTADO}.x; "
+            "instale essa versão ou atualize Sessao._remover_primeiro_item."
+        )
+    if not streamlit.__version__.startswith(f"{STREAMLIT_TESTADO}."):
+        print(
+            f"Aviso: Streamlit {streamlit.__version__}; o teste de carga foi validado com o {STREAMLIT_TESTADO}.x.",
+            file=sys.stderr,
+        )
+
+
+class Sessao:
+    def __init__(self, nome, timeout):
+        from streamlit.testing.v1 import AppTest
+
+        self.nome = nome
+        self.app = AppTest.from_file(APP, default_timeout=timeout)
+        self.latencias = []
+        self.erros = []
+
+    def _medir(self, acao, executar):
+        inicio = time.perf_counter()
+        executar()
+        self.latencias.append((acao, time.perf_counter() - inicio))
+        if self.app.exception:
+            self.erros.append(f"{acao}: {self.app.exception[0].message}")
+
+    def _botao(self, prefixo):
+        return next(botao for botao in self.app.button if botao.label.startswith(prefixo))
+
+    def _remover_primeiro_item(self):
+        # O AppTest não edita st.data_editor: o estado do editor é enviado como
+        # o navegador enviaria, marcando "Remover" na primeira linha
+        editor = next(df for df in self.app.dataframe if df.key and df.key.startswith("editor_remocao_"))
+        estados = self.app._tree.get_widget_states()
+        estado = estados.widgets.add()
+        estado.id = editor.proto.id
+        estado.string_value = json.dumps({"edited_rows": {"0": {"Remover": True}}, "added_rows": [], "deleted_rows": []})
+        self.app._run(estados)
+
+    # Os roteiros são geradores: cada yield devolve a vez para a próxima sessão
+    def comprar(self, itens, gerador):
+        app = self.app
+        self._medir("abrir", app.run)
+        yield
+        for _ in range(itens):
+            produtos = app.selectbox[0].options
+            self._medir("selecionar", app.selectbox[0].set_value(gerador.choice(produtos)).run)
+            yield
+            quantidade = next(campo for campo in app.number_input if campo.label == "Quantidade")
+            self._medir("quantidade", quantidade.set_value(gerador.randint(1, 3)).run)
+            yield
+            self._medir("adicionar", self._botao("➕").click().run)
+            yield
+        self._medir("remover", self._remover_primeiro_item)
+        yield
+        for rotulo, valor in (("Nome do Comprador", self.nome), ("Empresa / Equipe", "Carga"), ("Email", f"{self.nome}@carga.local")):
+            next(campo for campo in app.text_input if campo.label == rotulo).input(valor)
+        self._medir("finalizar", self._botao("💾").click().run)
+        if not any("finalizado com sucesso" in aviso.value for aviso in app.success):
+            self.erros.append("finalizar: pedido não confirmado")
+        yield
+
+    def ver_dashboard(self, gerador):
+        app = self.app
+        self._medir("dashboard", app.switch_page(PAGINA_DASHBOARD).run)
+        yield
+        if app.selectbox:
+            self._medir("dashboard_periodo", app.selectbox[0].set_value(gerador.choice(app.selectbox[0].options)).run)
+            yield
+
+    def roteiro(self, indice, args):
+        gerador = random.Random(indice)
+        if indice < args.sessoes * args.fracao_dashboard:
+            yield from self.ver_dashboard(gerador)
+        else:
+            for _ in range(args.pedidos):
+                yield from self.comprar(args.itens, gerador)
+
+
+def _processo(pasta, indice_processo, args, fila):
+    from instrumentacao import obter_metricas
+
+    os.chdir(pasta)
+    # Aquecimento: catálogo, índices e registro abertos antes da medição
+    Sessao("aquecimento", args.timeout).app.run()
+    obter_metricas().zerar()
+    memoria_inicial = _memoria_rss()
+
+    sessoes = [Sessao(f"Carga {indice_processo}-{i}", args.timeout) for i in range(args.sessoes)]
+    ativas = [(sessao, sessao.roteiro(i, args)) for i, sessao in enumerate(sessoes)]
+    inicio = time.perf_counter()
+    while ativas:
+        # Um rerun de cada sessão por rodada, até todas terminarem o roteiro
+        proximas = []
+        for sessao, passos in ativas:
+            try:
+                next(passos)
+                proximas.append((sessao, passos))
+            except StopIteration:
+                pass
+            except Exception as e:
+                sessao.erros.append(f"{type(e).__name__}: {e}")
+        ativas = proximas
+    segundos = time.perf_counter() - inicio
+
+    # As sessões continuam vivas aqui: a diferença de memória é o que elas ocupam
+    memoria_sessoes = _memoria_rss() - memoria_inicial
+    etapas = obter_metricas().tabela()
+    fila.put({
+        "segundos": segundos,
+        "latencias": [latencia for sessao in sessoes for latencia in sessao.latencias],
+        "erros": [erro for sessao in sessoes for erro in sessao.erros],
+        "memoria_por_sessao_bytes": memoria_sessoes / max(1, len(sessoes)),
+        "etapas": etapas[["execucoes", "segundos_medio", "segundos_max"]].to_dict(orient="index"),
+    })
+
+
+def resumir(resultados, args):
+    latencias = [latencia for resultado in resultados for latencia in resultado["latencias"]]
+    segundos = max(resultado["segundos"] for resultado in resultados)
+
+    def percentis(valores):
+        valores = np.asarray(valores, dtype="float64")
+        if not len(valores):
+            return {f"p{p}_s": None for p in PERCENTIS}
+        return {f"p{p}_s": float(np.percentile(valores, p)) for p in PERCENTIS}
+
+    por_acao = {}
+    for acao, segundos_acao in latencias:
+        por_acao.setdefault(acao, []).append(segundos_acao)
+    finalizados = len(por_acao.get("finalizar", []))
+    return {
+        "versao_git": versao_git(),
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "processos": args.processos,
+        "sessoes_por_processo": args.sessoes,
+        "sessoes": args.processos * args.sessoes,
+        "segundos": segundos,
+        "reruns": len(latencias),
+        "reruns_por_s": len(latencias) / segundos,
+        "pedidos_por_s": finalizados / segundos,
+        **percentis([segundos_acao for _, segundos_acao in latencias]),
+        "por_acao": {acao: {"reruns": len(valores), **percentis(valores)} for acao, valores in sorted(por_acao.items())},
+        "memoria_por_sessao_bytes": float(np.mean([resultado["memoria_por_sessao_bytes"] for resultado in resultados])),
+        "etapas": [resultado["etapas"] for resultado in resultados],
+        "erros": [erro for resultado in resultados for erro in resultado["erros"]],
+    }
+
+
+def _formatar(segundos):
+    return "-" if segundos is None else f"{segundos * 1000:8.1f} ms"
+
+
+def imprimir(resumo):
+    print(f"\n{resumo['sessoes']} sessões ({resumo['processos']} processo(s)) em {resumo['segundos']:.1f} s")
+    print(f"  reruns: {resumo['reruns']}  ({resumo['reruns_por_s']:.1f}/s)   pedidos: {resumo['pedidos_por_s']:.2f}/s")
+    print(f"  memória por sessão: {resumo['memoria_por_sessao_bytes'] / 2**20:.2f} MiB")
+    print(f"  {'ação':<20} {'reruns':>7} {'p50':>11} {'p95':>11} {'p99':>11}")
+    linhas = [("todas", {"reruns": resumo["reruns"], **{f"p{p}_s": resumo[f"p{p}_s"] for p in PERCENTIS}})]
+    for acao, medidas in linhas + list(resumo["por_acao"].items()):
+        print(f"  {acao:<20} {medidas['reruns']:>7} " + " ".join(f"{_formatar(medidas[f'p{p}_s']):>11}" for p in PERCENTIS))
+    if resumo["erros"]:
+        print(f"\n  {len(resumo['erros'])} erros; primeiros:")
+        for erro in resumo["erros"][:5]:
+            print(f"    {erro}")
+
+
+def comparar(atual, caminho_base, limite):
+    with open(caminho_base, encoding="utf-8") as arquivo:
+        base = json.load(arquivo)
+    print(f"\nComparação com {base['versao_git']} ({caminho_base}, {base['sessoes']} sessões):")
+    regressoes = 0
+    # Latência: maior é pior; vazão e memória por sessão também entram
+    for medida, maior_pior in (("p50_s", True), ("p95_s", True), ("p99_s", True), ("reruns_por_s", False),
+                               ("memoria_por_sessao_bytes", True)):
+        anterior, novo = base.get(medida), atual.get(medida)
+        if not anterior or novo is None:
+            continue
+        razao = novo / anterior if maior_pior else anterior / novo
+        marca = "  <-- regressão" if razao > limite else ""
+        regressoes += bool(marca)
+        print(f"  {medida:<26} {anterior:14.4f} -> {novo:14.4f}  x{razao:.2f}{marca}")
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga das páginas do app com sessões simuladas")
+    parser.add_argument("--sessoes", type=int, default=8, help="sessões abertas ao mesmo tempo por processo")
+    parser.add_argument("--processos", type=int, default=1)
+    parser.add_argument("--pedidos", type=int, default=2, help="pedidos finalizados por sessão de compra")
+    parser.add_argument("--itens", type=int, default=3, help="produtos adicionados por pedido")
+    parser.add_argument("--fracao-dashboard", type=float, default=0.25, help="fração das sessões que abre o dashboard")
+    parser.add_argument("--produtos", type=int, help="usa um catálogo sintético com esse número de produtos")
+    parser.add_argument("--timeout", type=float, default=120, help="limite de segundos por rerun")
+    parser.add_argument("--saida", help="arquivo JSON (padrão: benchmarks/resultados/carga_<commit>.json)")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior")
+    parser.add_argument("--limite", type=float, default=LIMITE_REGRESSAO, help="razão tratada como regressão")
+    args = parser.parse_args()
+
+    verificar_apptest()
+    with tempfile.TemporaryDirectory() as pasta:
+        preparar_dados(pasta, args.produtos)
+        # Processos separados, como vários workers do servidor sobre os mesmos arquivos
+        contexto = multiprocessing.get_context("spawn")
+        fila = contexto.Queue()
+        processos = [contexto.Process(target=_processo, args=(pasta, i, args, fila)) for i in range(args.processos)]
+        for processo in processos:
+            processo.start()
+        resultados = [fila.get() for _ in processos]
+        for processo in processos:
+            processo.join()
+
+    resumo = resumir(resultados, args)
+    imprimir(resumo)
+
+    saida = args.saida or os.path.join(os.path.dirname(os.path.abspath(__file__)), "resultados", f"carga_{resumo['versao_git']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+    with open(saida, "w", encoding="utf-8") as arquivo:
+        json.dump(resumo, arquivo, ensure_ascii=False, indent=2)
+    print(f"\nResultados gravados em {saida}")
+
+    if args.comparar and comparar(resumo, args.comparar, args.limite):
+        sys.exit(1)
+    if resumo["erros"]:
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
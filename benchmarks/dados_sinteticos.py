@@ -0,0 +1,52 @@
+import os
+import sys
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from registro_vendas import COLUNAS_VENDA
+
+# Históricos de venda sintéticos no layout dos venda_*.csv; os catálogos vêm
+# do gerador_catalogo. Tudo sai de geradores com semente fixa, então os mesmos
+# tamanhos geram os mesmos dados.
+
+EMPRESAS = np.array([f"Equipe {i:03d}" for i in range(200)])
+
+
+def gerar_vendas(linhas, df_produtos, dias=365, semente=0, hoje=None):
+    rng = np.random.default_rng(semente + 1)
+    hoje = hoje or date.today()
+    datas = pd.date_range(hoje - timedelta(days=dias - 1), hoje).strftime("%Y-%m-%d").to_numpy()
+
+    posicoes = rng.integers(0, len(df_produtos), linhas)
+    quantidades = rng.integers(1, 6, linhas)
+    unitarios = df_produtos["Preço Final c/ Impostos (R$)"].to_numpy()[posicoes]
+    totais = np.round(unitarios * quantidades, 2)
+    empresas = EMPRESAS[rng.integers(0, len(EMPRESAS), linhas)]
+    compradores = np.char.add("Comprador ", empresas.astype(str))
+
+    return pd.DataFrame({
+        "Data da Compra": datas[rng.integers(0, len(datas), linhas)],
+        "Nome do Comprador": compradores,
+        "Empresa": empresas,
+        "Email": np.char.add(np.char.replace(np.char.lower(empresas), " ", ""), "@mail.com"),
+        "Produto": df_produtos["Nome do Produto"].to_numpy()[posicoes],
+        "Categoria": df_produtos["Categoria"].to_numpy()[posicoes],
+        "Quantidade": quantidades,
+        "Valor Unitário (R$)": unitarios,
+        "Valor Total (R$)": totais,
+        "Encargo (%)": 20.0,
+        "Encargo (R$)": np.round(totais * 0.2, 2),
+    }, columns=COLUNAS_VENDA)
+
+
+def gravar_arquivos_venda(df_vendas, pasta, linhas_por_arquivo=10_000):
+    # Histórico espalhado em venda_*.csv, como os pedidos antigos do app
+    os.makedirs(pasta, exist_ok=True)
+    for i, inicio in enumerate(range(0, len(df_vendas), linhas_por_arquivo)):
+        df_vendas.iloc[inicio:inicio + linhas_por_arquivo].to_csv(
+            os.path.join(pasta, f"venda_SINTETICO_{i:06d}.csv"), index=False
+        )
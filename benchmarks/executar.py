@@ -0,0 +1,212 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import agregados
+from busca import IndiceBusca
+from carregador_vendas import CarregadorVendas
+from carrinho import Carrinho
+from catalogo import Catalogo, compilar_catalogo, ler_catalogo, ler_catalogo_colunar
+from gerador_catalogo import gerar_catalogo
+from moeda import formatar_brl, para_centavos
+from pedido import montar_pedido
+from registro_vendas import RegistroVendas
+
+from dados_sinteticos import gerar_vendas, gravar_arquivos_venda
+
+# Benchmarks dos caminhos executados a cada rerun das páginas de compras e do dashboard.
+# Uso:
+#   python benchmarks/executar.py                       # tamanhos pequenos
+#   python benchmarks/executar.py --escala completa     # 10³–10⁶ produtos, 10³–10⁷ vendas
+#   python benchmarks/executar.py --comparar benchmarks/resultados/<commit>.json
+# Os resultados vão para benchmarks/resultados/<commit>.json
+
+ESCALAS = {
+    "rapida": ([1_000, 10_000], [1_000, 10_000]),
+    "completa": ([1_000, 10_000, 100_000, 1_000_000], [1_000, 10_000, 100_000, 1_000_000, 10_000_000]),
+}
+CONSULTAS = 1_000
+ITENS_CARRINHO = 100
+PEDIDOS_CHECKOUT = 50
+LINHAS_POR_PEDIDO_HISTORICO = 1_000
+LIMITE_REGRESSAO = 1.25
+
+
+def medir(funcao, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return {"repeticoes": repeticoes, "min_s": min(tempos), "mediana_s": statistics.median(tempos)}
+
+
+def versao_git():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconhecida"
+
+
+def bench_catalogo(linhas, pasta, repeticoes, registrar):
+    caminho_csv = os.path.join(pasta, f"produtos_{linhas}.csv")
+    df_produtos = gerar_catalogo(linhas)
+    df_produtos.to_csv(caminho_csv, index=False)
+    caminho_colunar = compilar_catalogo(caminho_csv)
+
+    registrar("catalogo.ler_csv", linhas, medir(lambda: ler_catalogo(caminho_csv), repeticoes))
+    registrar("catalogo.ler_colunar", linhas, medir(lambda: ler_catalogo_colunar(caminho_colunar), repeticoes))
+
+    catalogo = Catalogo(ler_catalogo(caminho_csv))
+    rng = np.random.default_rng(0)
+    nomes = [catalogo.nomes[i] for i in rng.integers(0, len(catalogo.nomes), CONSULTAS)]
+
+    def consultar():
+        for nome in nomes:
+            catalogo.produto(nome)
+
+    registrar(f"catalogo.produto_x{CONSULTAS}", linhas, medir(consultar, repeticoes))
+
+    indice = IndiceBusca(catalogo)
+    registrar("busca.buscar", linhas, medir(lambda: indice.buscar("asus placa modelo", 0, 50), repeticoes))
+
+    precos = para_centavos(catalogo.df["Preço Final c/ Impostos (R$)"])
+    registrar("moeda.formatar_brl", linhas, medir(lambda: formatar_brl(precos), repeticoes))
+
+    def reconstruir_carrinho():
+        carrinho = Carrinho()
+        for nome in nomes[:ITENS_CARRINHO]:
+            info = catalogo.produto(nome)
+            carrinho.adicionar(nome, info["Categoria"], 1, para_centavos(info["Preço Final c/ Impostos (R$)"]))
+        carrinho.exibicao()
+
+    registrar(f"carrinho.reconstruir_x{ITENS_CARRINHO}", linhas, medir(reconstruir_carrinho, repeticoes))
+
+
+def bench_vendas(linhas, df_produtos, pasta, repeticoes, registrar):
+    df_vendas = gerar_vendas(linhas, df_produtos)
+
+    # Caminho das vendas antigas: leitura dos venda_*.csv e resumo em memória
+    pasta_csv = os.path.join(pasta, f"vendas_{linhas}")
+    gravar_arquivos_venda(df_vendas, pasta_csv)
+    registrar("vendas.carregar_csv", linhas, medir(lambda: CarregadorVendas(pasta_csv).carregar(), repeticoes))
+    registrar("dashboard.resumir_csv", linhas, medir(lambda: agregados.resumir(df_vendas), repeticoes))
+
+    # Registro em SQLite com o histórico gravado em pedidos de tamanho fixo
+    registro = RegistroVendas(os.path.join(pasta, f"vendas_{linhas}.db"))
+    pedidos = [
+        df_vendas.iloc[inicio:inicio + LINHAS_POR_PEDIDO_HISTORICO]
+        for inicio in range(0, linhas, LINHAS_POR_PEDIDO_HISTORICO)
+    ]
+    for inicio in range(0, len(pedidos), 100):
+        registro.registrar_pedidos(pedidos[inicio:inicio + 100])
+
+    # Janela padrão do dashboard: últimos 30 dias
+    desde = (date.today() - timedelta(days=29)).isoformat()
+
+    def totais_dashboard():
+        registro.totais()
+        registro.serie(desde)
+        for dimensao in agregados.PARTICOES:
+            registro.periodo(dimensao, desde)
+        registro.pagina_vendas(0, 50, desde)
+
+    registrar("dashboard.totais_registro", linhas, medir(totais_dashboard, repeticoes))
+
+    colunas = {
+        "Produto": df_produtos["Nome do Produto"].iloc[:5].tolist(),
+        "Categoria": df_produtos["Categoria"].iloc[:5].tolist(),
+        "Quantidade": [1, 2, 3, 1, 2],
+        "Unitário (centavos)": para_centavos(df_produtos["Preço Final c/ Impostos (R$)"].iloc[:5]).tolist(),
+    }
+
+    def checkout():
+        for _ in range(PEDIDOS_CHECKOUT):
+            registro.registrar_pedido(montar_pedido(colunas, "Comprador", "Empresa", "comprador@mail.com"))
+
+    registrar(f"checkout.gravar_x{PEDIDOS_CHECKOUT}", linhas, medir(checkout, repeticoes))
+    registro.fechar()
+
+
+def comparar(atual, caminho_base, limite):
+    with open(caminho_base, encoding="utf-8") as arquivo:
+        base = json.load(arquivo)
+    tempos_base = {(r["caso"], r["tamanho"]): r["min_s"] for r in base["resultados"]}
+    regressoes = 0
+    print(f"\nComparação com {base['versao_git']} ({caminho_base}):")
+    for r in atual["resultados"]:
+        anterior = tempos_base.get((r["caso"], r["tamanho"]))
+        if not anterior:
+            continue
+        razao = r["min_s"] / anterior
+        marca = ""
+        if razao > limite:
+            marca = "  <-- regressão"
+            regressoes += 1
+        print(f"  {r['caso']:<32} {r['tamanho']:>10}  {anterior:10.4f}s -> {r['min_s']:10.4f}s  x{razao:.2f}{marca}")
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks do app de fornecedores")
+    parser.add_argument("--escala", choices=ESCALAS, default="rapida")
+    parser.add_argument("--catalogos", type=int, nargs="+", help="tamanhos de catálogo (substitui a escala)")
+    parser.add_argument("--vendas", type=int, nargs="+", help="tamanhos de histórico de vendas (substitui a escala)")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--saida", help="arquivo JSON (padrão: benchmarks/resultados/<commit>.json)")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior")
+    parser.add_argument("--limite", type=float, default=LIMITE_REGRESSAO, help="razão de tempo tratada como regressão")
+    args = parser.parse_args()
+
+    tamanhos_catalogo, tamanhos_vendas = ESCALAS[args.escala]
+    tamanhos_catalogo = args.catalogos or tamanhos_catalogo
+    tamanhos_vendas = args.vendas or tamanhos_vendas
+
+    resultados = []
+
+    def registrar(caso, tamanho, medida):
+        resultados.append({"caso": caso, "tamanho": tamanho, **medida})
+        print(f"{caso:<32} {tamanho:>10}  min {medida['min_s']:.4f}s  mediana {medida['mediana_s']:.4f}s", flush=True)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        for linhas in tamanhos_catalogo:
+            bench_catalogo(linhas, pasta, args.repeticoes, registrar)
+        # O histórico de vendas usa o menor catálogo: o custo aqui é o das vendas
+        df_produtos = gerar_catalogo(min(tamanhos_catalogo))
+        for linhas in tamanhos_vendas:
+            bench_vendas(linhas, df_produtos, pasta, args.repeticoes, registrar)
+
+    atual = {
+        "versao_git": versao_git(),
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "repeticoes": args.repeticoes,
+        "resultados": resultados,
+    }
+    saida = args.saida or os.path.join(os.path.dirname(os.path.abspath(__file__)), "resultados", f"{atual['versao_git']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+    with open(saida, "w", encoding="utf-8") as arquivo:
+        json.dump(atual, arquivo, ensure_ascii=False, indent=2)
+    print(f"\nResultados gravados em {saida}")
+
+    if args.comparar and comparar(atual, args.comparar, args.limite):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
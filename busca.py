@@ -0,0 +1,216 @@
+import bisect
+import string
+import threading
+import unicodedata
+import weakref
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from catalogo import COLUNA_NOME
+
+# Pesos de cada campo na pontuação da busca
+PESO_NOME = 3.0
+PESO_CATEGORIA = 2.0
+PESO_DESCRICAO = 1.0
+# Token idêntico ao termo pesa mais que um token que só começa com ele
+FATOR_PREFIXO = 0.8
+# Similaridade mínima (trigramas em comum) para a busca aproximada
+SIMILARIDADE_MINIMA = 0.25
+
+# Pontuação vira espaço: "Placa-mãe" -> "placa mãe"
+_SEPARADORES = str.maketrans({caractere: " " for caractere in string.punctuation})
+
+
+def sem_acentos(token):
+    # "mãe" -> "mae", para "placa-mãe" casar com "placa mae"
+    if token.isascii():
+        return token
+    return unicodedata.normalize("NFKD", token).encode("ascii", errors="ignore").decode("ascii")
+
+
+def tokenizar(texto):
+    tokens = (sem_acentos(token) for token in str(texto).lower().translate(_SEPARADORES).split())
+    return [token for token in tokens if token]
+
+
+def _trigramas(token):
+    token = f" {token} "
+    return {token[i:i + 3] for i in range(len(token) - 2)}
+
+
+class _CampoCategorico:
+    # Campos com poucos valores distintos (Categoria, Descrição): o índice
+    # guarda token -> códigos e expande para as linhas só na consulta
+    def __init__(self, serie, peso):
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            categorias = serie.array
+        else:
+            categorias = pd.Categorical(serie.astype(str))
+        self.peso = peso
+        codigos = categorias.codes
+        ordem = np.argsort(codigos, kind="stable")
+        limites = np.searchsorted(codigos[ordem], np.arange(len(categorias.categories) + 1))
+        self._linhas = [ordem[limites[i]:limites[i + 1]] for i in range(len(categorias.categories))]
+
+        codigos_por_token = defaultdict(set)
+        for codigo, categoria in enumerate(categorias.categories):
+            for token in tokenizar(categoria):
+                codigos_por_token[token].add(codigo)
+        self.vocabulario = sorted(codigos_por_token)
+        self._codigos = [sorted(codigos_por_token[token]) for token in self.vocabulario]
+
+    def pontuar(self, termo, pontos):
+        inicio = bisect.bisect_left(self.vocabulario, termo)
+        fim = bisect.bisect_left(self.vocabulario, termo + "\uffff")
+        for i in range(inicio, fim):
+            peso = self.peso if self.vocabulario[i] == termo else self.peso * FATOR_PREFIXO
+            for codigo in self._codigos[i]:
+                linhas = self._linhas[codigo]
+                pontos[linhas] = np.maximum(pontos[linhas], peso)
+
+
+class ResultadoBusca:
+    def __init__(self, nomes, total, pagina, por_pagina):
+        self.nomes = nomes
+        self.total = total
+        self.pagina = pagina
+        self.por_pagina = por_pagina
+
+    @property
+    def paginas(self):
+        return max(1, -(-self.total // self.por_pagina))
+
+
+class IndiceBusca:
+    def __init__(self, catalogo):
+        df_produtos = catalogo.df
+        self.total_linhas = len(df_produtos)
+        self.nomes = df_produtos[COLUNA_NOME].to_numpy(dtype=object)
+
+        # Só a primeira linha de cada nome entra no índice (como no catálogo)
+        self.linhas_validas = np.fromiter(catalogo.indice.values(), dtype="int64", count=len(catalogo.indice))
+        self._validas = np.zeros(self.total_linhas, dtype=bool)
+        self._validas[self.linhas_validas] = True
+
+        # Nome: lista invertida em formato CSR (tokens ordenados -> fatia de linhas),
+        # assim todos os tokens com um prefixo formam uma única fatia contígua
+        nomes = df_produtos[COLUNA_NOME].iloc[self.linhas_validas].astype(str)
+        palavras = nomes.str.lower().str.translate(_SEPARADORES).str.split()
+        palavras.index = self.linhas_validas
+        palavras = palavras.explode().dropna()
+
+        # Acentos são removidos só das palavras distintas, não de cada linha
+        codigos, distintas = pd.factorize(palavras)
+        normalizadas = np.array([sem_acentos(palavra) for palavra in distintas.tolist()], dtype=object)
+        vocabulario, ids_distintas = np.unique(normalizadas, return_inverse=True)
+        ids = ids_distintas[codigos]
+        linhas = palavras.index.to_numpy(dtype="int64")
+
+        ordem = np.lexsort((linhas, ids))
+        ids, linhas = ids[ordem], linhas[ordem]
+        manter = np.ones(len(ids), dtype=bool)
+        manter[1:] = (ids[1:] != ids[:-1]) | (linhas[1:] != linhas[:-1])
+        ids, linhas = ids[manter], linhas[manter]
+
+        self.vocabulario = vocabulario.tolist()
+        self._inicios = np.searchsorted(ids, np.arange(len(self.vocabulario) + 1))
+        self._linhas_nome = linhas
+
+        # Trigramas do vocabulário de nomes, para tolerar erros de digitação
+        # (só palavras; códigos numéricos precisam ser digitados certo)
+        self._tokens_por_trigrama = defaultdict(list)
+        for posicao, token in enumerate(self.vocabulario):
+            if not token.isalpha():
+                continue
+            for trigrama in _trigramas(token):
+                self._tokens_por_trigrama[trigrama].append(posicao)
+
+        self._campos = [
+            _CampoCategorico(df_produtos[col], peso)
+            for col, peso in (("Categoria", PESO_CATEGORIA), ("Descrição", PESO_DESCRICAO))
+            if col in df_produtos.columns
+        ]
+
+    def _linhas_token(self, posicao):
+        return self._linhas_nome[self._inicios[posicao]:self._inicios[posicao + 1]]
+
+    def _aproximados(self, termo):
+        trigramas = _trigramas(termo)
+        contagem = defaultdict(int)
+        for trigrama in trigramas:
+            for posicao in self._tokens_por_trigrama.get(trigrama, ()):
+                contagem[posicao] += 1
+        for posicao, comuns in contagem.items():
+            similaridade = comuns / len(trigramas | _trigramas(self.vocabulario[posicao]))
+            if similaridade >= SIMILARIDADE_MINIMA:
+                yield posicao, similaridade
+
+    def _pontuar_termo(self, termo):
+        pontos = np.zeros(self.total_linhas, dtype="float32")
+
+        inicio = bisect.bisect_left(self.vocabulario, termo)
+        fim = bisect.bisect_left(self.vocabulario, termo + "\uffff")
+        if inicio < fim:
+            # Todos os tokens com o prefixo: uma fatia só da lista invertida
+            linhas = self._linhas_nome[self._inicios[inicio]:self._inicios[fim]]
+            pontos[linhas] = PESO_NOME * FATOR_PREFIXO
+            if self.vocabulario[inicio] == termo:
+                pontos[self._linhas_token(inicio)] = PESO_NOME
+        elif len(termo) >= 3 and termo.isalpha():
+            for posicao, similaridade in self._aproximados(termo):
+                linhas = self._linhas_token(posicao)
+                pontos[linhas] = np.maximum(pontos[linhas], PESO_NOME * FATOR_PREFIXO * similaridade)
+
+        for campo in self._campos:
+            campo.pontuar(termo, pontos)
+        return pontos
+
+    def buscar(self, consulta, pagina=0, por_pagina=20):
+        termos = tokenizar(consulta)
+        inicio = pagina * por_pagina
+
+        if not termos:
+            nomes = self.nomes[self.linhas_validas[inicio:inicio + por_pagina]].tolist()
+            return ResultadoBusca(nomes, len(self.linhas_validas), pagina, por_pagina)
+
+        # Todos os termos precisam casar com algum campo do produto
+        total = np.zeros(self.total_linhas, dtype="float32")
+        encontrados = self._validas.copy()
+        for termo in termos:
+            pontos = self._pontuar_termo(termo)
+            total += pontos
+            encontrados &= pontos > 0
+
+        candidatos = np.flatnonzero(encontrados)
+        fim = min(inicio + por_pagina, len(candidatos))
+        if inicio >= fim:
+            return ResultadoBusca([], len(candidatos), pagina, por_pagina)
+
+        # Ordena só o necessário para a página pedida: maior pontuação, depois
+        # ordem do catálogo. A chave inteira única mantém as páginas estáveis.
+        pontuacoes = np.rint(total[candidatos].astype("float64") * 1000).astype("int64")
+        chaves = -pontuacoes * (self.total_linhas + 1) + candidatos
+        if fim < len(chaves):
+            chaves = chaves[np.argpartition(chaves, fim - 1)[:fim]]
+        chaves.sort()
+        ordem = chaves[inicio:fim] % (self.total_linhas + 1)
+        return ResultadoBusca(self.nomes[ordem].tolist(), len(candidatos), pagina, por_pagina)
+
+
+# Um índice por versão do catálogo, compartilhado por todas as sessões
+_indices = weakref.WeakKeyDictionary()
+_trava = threading.Lock()
+
+
+def obter_indice(catalogo):
+    indice = _indices.get(catalogo)
+    if indice is not None:
+        return indice
+    with _trava:
+        indice = _indices.get(catalogo)
+        if indice is None:
+            indice = IndiceBusca(catalogo)
+            _indices[catalogo] = indice
+        return indice
@@ -0,0 +1,239 @@
+import fnmatch
+import io
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from pedido import VALOR_MAXIMO_CENTAVOS
+from registro_vendas import COLUNAS_VENDA
+
+# Arquivos de venda gravados antes do registro em SQLite
+PADRAO_PEDIDOS = "venda_*.csv"
+ARQUIVOS_EXTRAS = ("vendas.csv",)
+
+# Meses fechados compactados pelo compactacao_vendas.py: um Parquet por mês,
+# listado no manifesto junto com os arquivos de origem já incorporados
+PASTA_ARQUIVO = "arquivo"
+MANIFESTO = "manifesto.json"
+TENTATIVAS_LEITURA = 3
+# Diferença aceita, em centavos, entre o Valor Total e Quantidade × Valor Unitário
+# (arredondamento do app antigo)
+TOLERANCIA_CENTAVOS = 1
+
+_BOM = b"\xef\xbb\xbf"
+
+
+class _Lote:
+    def __init__(self, assinaturas, df_vendas, ilegiveis=None, descartadas=0):
+        # caminho -> (mtime_ns, tamanho) de cada arquivo que gerou este lote
+        self.assinaturas = assinaturas
+        self.df = df_vendas
+        # caminho -> erro dos arquivos que não puderam ser lidos
+        self.ilegiveis = ilegiveis or {}
+        # Linhas deixadas de fora por valores inconsistentes
+        self.descartadas = descartadas
+
+    def valido(self, arquivos):
+        return all(arquivos.get(caminho) == assinatura for caminho, assinatura in self.assinaturas.items())
+
+
+def _ler_bytes(caminho):
+    with open(caminho, "rb") as arquivo:
+        return arquivo.read()
+
+
+def _ler_csv(cabecalho, corpos):
+    return pd.read_csv(io.BytesIO(cabecalho + b"\n" + b"".join(corpos)))
+
+
+def _ler_grupo(cabecalho, partes, ilegiveis):
+    # Arquivos com o mesmo cabeçalho num parse só; se algum estiver malformado,
+    # o grupo é relido arquivo a arquivo e só os ruins ficam de fora
+    try:
+        return [_ler_csv(cabecalho, [corpo for _, corpo in partes])]
+    except (pd.errors.ParserError, UnicodeDecodeError):
+        pass
+    frames = []
+    for caminho, corpo in partes:
+        try:
+            frames.append(_ler_csv(cabecalho, [corpo]))
+        except (pd.errors.ParserError, UnicodeDecodeError) as e:
+            ilegiveis[caminho] = str(e)
+    return frames
+
+
+def separar_inconsistentes(df_vendas):
+    # Linhas cujo Valor Total não bate com Quantidade × Valor Unitário, ou passa
+    # do que um pedido aceita hoje, não entram nos totais
+    quantidades = pd.to_numeric(df_vendas["Quantidade"], errors="coerce")
+    unitarios = pd.to_numeric(df_vendas["Valor Unitário (R$)"], errors="coerce")
+    totais = pd.to_numeric(df_vendas["Valor Total (R$)"], errors="coerce")
+    diferencas = np.rint(totais * 100) - np.rint(quantidades * unitarios * 100)
+    inconsistentes = (diferencas.abs() > TOLERANCIA_CENTAVOS) | (totais.abs() * 100 > VALOR_MAXIMO_CENTAVOS)
+    inconsistentes = inconsistentes.fillna(False).to_numpy(dtype=bool)
+    if not inconsistentes.any():
+        return df_vendas, 0
+    return df_vendas[~inconsistentes].reset_index(drop=True), int(inconsistentes.sum())
+
+
+def ler_manifesto(pasta):
+    try:
+        with open(os.path.join(pasta, PASTA_ARQUIVO, MANIFESTO), encoding="utf-8") as arquivo:
+            return json.load(arquivo)
+    except FileNotFoundError:
+        return {"versao": 1, "geracao": 0, "particoes": {}, "compactados": {}}
+
+
+class CarregadorVendas:
+    def __init__(self, pasta, padrao=PADRAO_PEDIDOS, extras=ARQUIVOS_EXTRAS, max_workers=None):
+        self.pasta = pasta
+        self.padrao = padrao
+        self.extras = set(extras)
+        self.max_workers = max_workers
+
+        self._trava = threading.Lock()
+        self._lotes = []
+        self._df = pd.DataFrame(columns=COLUNAS_VENDA)
+        self._assinatura = ()
+        # Incrementada a cada mudança nos arquivos; serve de chave de cache barata
+        self.versao = 0
+        # Momento (time.monotonic) da última listagem da pasta
+        self._verificado_em = None
+        # O que ficou de fora da última carga: arquivos ilegíveis e linhas inconsistentes
+        self.ilegiveis = {}
+        self.descartadas = 0
+
+    def descobrir(self):
+        arquivos = {}
+        try:
+            entradas = os.scandir(self.pasta)
+        except FileNotFoundError:
+            return arquivos
+        with entradas:
+            for entrada in entradas:
+                if not entrada.is_file():
+                    continue
+                if entrada.name in self.extras or fnmatch.fnmatch(entrada.name, self.padrao):
+                    try:
+                        info = entrada.stat()
+                    except FileNotFoundError:
+                        # Removido depois de compactado; o manifesto lido abaixo já o inclui
+                        continue
+                    arquivos[entrada.path] = (info.st_mtime_ns, info.st_size)
+
+        # O manifesto é lido depois da listagem: um arquivo ainda listado mas já
+        # compactado é reconhecido pela assinatura e não é contado duas vezes
+        manifesto = ler_manifesto(self.pasta)
+        for nome, assinatura in manifesto["compactados"].items():
+            caminho = os.path.join(self.pasta, nome)
+            if arquivos.get(caminho) == tuple(assinatura):
+                del arquivos[caminho]
+        for particao in manifesto["particoes"].values():
+            caminho = os.path.join(self.pasta, PASTA_ARQUIVO, particao["arquivo"])
+            info = os.stat(caminho)
+            arquivos[caminho] = (info.st_mtime_ns, info.st_size)
+        return arquivos
+
+    def _ler_lote(self, caminhos):
+        # Partições compactadas já vêm tipadas do Parquet
+        particoes = [pd.read_parquet(caminho) for caminho in caminhos if caminho.endswith(".parquet")]
+        caminhos = [caminho for caminho in caminhos if not caminho.endswith(".parquet")]
+
+        # Leitura dos arquivos em paralelo (E/S); o parse acontece uma vez só,
+        # juntando todos os arquivos com o mesmo cabeçalho num único CSV
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            conteudos = list(executor.map(_ler_bytes, caminhos))
+
+        grupos = {}
+        for caminho, conteudo in zip(caminhos, conteudos):
+            conteudo = conteudo.removeprefix(_BOM)
+            if not conteudo.strip():
+                continue
+            cabecalho, _, corpo = conteudo.partition(b"\n")
+            if corpo and not corpo.endswith(b"\n"):
+                corpo += b"\n"
+            grupos.setdefault(cabecalho.rstrip(b"\r"), []).append((caminho, corpo))
+
+        ilegiveis = {}
+        frames = list(particoes)
+        for cabecalho, partes in grupos.items():
+            frames.extend(_ler_grupo(cabecalho, partes, ilegiveis))
+        if not frames:
+            return pd.DataFrame(columns=COLUNAS_VENDA), ilegiveis, 0
+        df_vendas, descartadas = separar_inconsistentes(pd.concat(frames, ignore_index=True))
+        return df_vendas, ilegiveis, descartadas
+
+    def carregar(self, idade_maxima=None):
+        # Com idade_maxima (segundos), aceita o resultado da última listagem se
+        # ela for recente, sem percorrer a pasta de novo
+        if idade_maxima is not None:
+            with self._trava:
+                if self._verificado_em is not None and time.monotonic() - self._verificado_em < idade_maxima:
+                    return self._df, self.versao
+
+        # Uma compactação pode trocar os arquivos entre a listagem e a leitura;
+        # a nova listagem já enxerga o manifesto atualizado
+        for tentativa in range(TENTATIVAS_LEITURA):
+            try:
+                return self._carregar()
+            except FileNotFoundError:
+                if tentativa == TENTATIVAS_LEITURA - 1:
+                    raise
+
+    def _carregar(self):
+        verificado_em = time.monotonic()
+        arquivos = self.descobrir()
+        assinatura = tuple(sorted(arquivos.items()))
+
+        with self._trava:
+            self._verificado_em = verificado_em
+            if assinatura == self._assinatura:
+                return self._df, self.versao
+
+            # Lotes cujos arquivos não mudaram continuam em cache;
+            # só arquivos novos ou alterados são lidos de novo
+            lotes = [lote for lote in self._lotes if lote.valido(arquivos)]
+            cobertos = set()
+            for lote in lotes:
+                cobertos.update(lote.assinaturas)
+
+            novos = sorted(caminho for caminho in arquivos if caminho not in cobertos)
+            if novos:
+                lotes.append(_Lote({caminho: arquivos[caminho] for caminho in novos}, *self._ler_lote(novos)))
+
+            frames = [lote.df for lote in lotes if not lote.df.empty]
+            if frames:
+                self._df = pd.concat(frames, ignore_index=True)
+            else:
+                self._df = pd.DataFrame(columns=COLUNAS_VENDA)
+            self.ilegiveis = {caminho: erro for lote in lotes for caminho, erro in lote.ilegiveis.items()}
+            self.descartadas = sum(lote.descartadas for lote in lotes)
+            self._lotes = lotes
+            self._assinatura = assinatura
+            self.versao += 1
+            return self._df, self.versao
+
+
+# Um carregador por pasta, compartilhado por todas as sessões do processo
+_carregadores = {}
+_trava_carregadores = threading.Lock()
+
+
+def obter_carregador(pasta):
+    chave = os.path.abspath(pasta)
+    with _trava_carregadores:
+        carregador = _carregadores.get(chave)
+        if carregador is None:
+            carregador = CarregadorVendas(chave)
+            _carregadores[chave] = carregador
+        return carregador
+
+
+def liberar_carregador(pasta):
+    with _trava_carregadores:
+        _carregadores.pop(os.path.abspath(pasta), None)
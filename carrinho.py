@@ -0,0 +1,91 @@
+import pandas as pd
+
+from moeda import formatar_brl
+
+COLUNAS_CARRINHO = ["Produto", "Categoria", "Quantidade", "Valor Unitário (R$)", "Valor Total (R$)"]
+
+
+class Carrinho:
+    def __init__(self):
+        # Produto -> [categoria, quantidade, valor unitário em centavos]
+        self._itens = {}
+        self.total_centavos = 0
+        # Incrementada a cada alteração; invalida a tabela de exibição
+        self.versao = 0
+        self._exibicao = None
+
+    def __len__(self):
+        return len(self._itens)
+
+    def __contains__(self, produto):
+        return produto in self._itens
+
+    def _alterado(self):
+        self.versao += 1
+        self._exibicao = None
+
+    def adicionar(self, produto, categoria, quantidade, unitario_centavos):
+        quantidade = int(quantidade)
+        if quantidade <= 0:
+            raise ValueError("A quantidade deve ser positiva.")
+
+        item = self._itens.get(produto)
+        if item is None:
+            self._itens[produto] = [categoria, quantidade, int(unitario_centavos)]
+        else:
+            # Mesmo produto: soma a quantidade, mantendo o preço da primeira inclusão
+            item[1] += quantidade
+        self.total_centavos += quantidade * self._itens[produto][2]
+        self._alterado()
+
+    def adicionar_lote(self, colunas):
+        # Mesmas regras de adicionar(), com uma única alteração de versão no fim
+        itens = zip(colunas["Produto"], colunas["Categoria"], colunas["Quantidade"], colunas["Unitário (centavos)"])
+        for produto, categoria, quantidade, unitario_centavos in itens:
+            quantidade = int(quantidade)
+            if quantidade <= 0:
+                raise ValueError("A quantidade deve ser positiva.")
+            item = self._itens.get(produto)
+            if item is None:
+                item = self._itens[produto] = [categoria, 0, int(unitario_centavos)]
+            item[1] += quantidade
+            self.total_centavos += quantidade * item[2]
+        self._alterado()
+
+    def remover(self, produto):
+        categoria, quantidade, unitario_centavos = self._itens.pop(produto)
+        self.total_centavos -= quantidade * unitario_centavos
+        self._alterado()
+
+    def quantidade(self, produto):
+        item = self._itens.get(produto)
+        return item[1] if item else 0
+
+    def limpar(self):
+        self._itens.clear()
+        self.total_centavos = 0
+        self._alterado()
+
+    def colunas(self):
+        # Conteúdo do carrinho como colunas (listas), sem um dict por linha
+        itens = list(self._itens.values())
+        return {
+            "Produto": list(self._itens),
+            "Categoria": [item[0] for item in itens],
+            "Quantidade": [item[1] for item in itens],
+            "Unitário (centavos)": [item[2] for item in itens],
+        }
+
+    def exibicao(self):
+        # Tabela formatada para a tela, refeita só quando o carrinho muda
+        if self._exibicao is None:
+            colunas = self.colunas()
+            unitarios = pd.Series(colunas["Unitário (centavos)"], dtype="int64")
+            self._exibicao = pd.DataFrame({
+                "Produto": colunas["Produto"],
+                "Categoria": colunas["Categoria"],
+                "Quantidade": colunas["Quantidade"],
+                "Valor Unitário (R$)": formatar_brl(unitarios),
+                "Valor Total (R$)": formatar_brl(unitarios * pd.Series(colunas["Quantidade"], dtype="int64")),
+            }, columns=COLUNAS_CARRINHO)
+        return self._exibicao
@@ -0,0 +1,229 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Colunas do catálogo de produtos
+COLUNA_NOME = "Nome do Produto"
+COLUNAS_CATEGORICAS = ["Categoria", "Descrição"]
+COLUNAS_NUMERICAS = [
+    "Preço Base (R$)",
+    "Imposto de Importação (%)",
+    "ICMS (%)",
+    "IPI (%)",
+    "Preço Final c/ Impostos (R$)",
+]
+COLUNAS_PRECO = ["Preço Base (R$)", "Preço Final c/ Impostos (R$)"]
+
+# Formato colunar compilado a partir do CSV (ver compilar_catalogo)
+EXTENSAO_COLUNAR = ".colunar"
+VERSAO_COLUNAR = 1
+
+
+class Catalogo:
+    def __init__(self, df_produtos, assinatura=None):
+        self.df = df_produtos
+        self.assinatura = assinatura
+
+        # Índice nome -> posição da linha (a primeira ocorrência vence, como no .iloc[0])
+        self.indice = {}
+        for posicao, nome in enumerate(df_produtos[COLUNA_NOME].tolist()):
+            self.indice.setdefault(nome, posicao)
+
+        # Lista de nomes únicos na ordem do arquivo, pronta para o selectbox
+        self.nomes = list(self.indice)
+
+        # Colunas já convertidas para arrays, para consulta por posição sem criar Series
+        self._colunas = {col: df_produtos[col].to_numpy() for col in df_produtos.columns}
+
+    def __len__(self):
+        return len(self.indice)
+
+    def __contains__(self, nome):
+        return nome in self.indice
+
+    def posicao(self, nome):
+        return self.indice[nome]
+
+    def produto(self, nome):
+        posicao = self.indice[nome]
+        return {col: valores[posicao] for col, valores in self._colunas.items()}
+
+
+def tipar_catalogo(df_produtos):
+    df_produtos[COLUNA_NOME] = df_produtos[COLUNA_NOME].astype(str)
+    for col in COLUNAS_CATEGORICAS:
+        if col in df_produtos.columns:
+            df_produtos[col] = df_produtos[col].astype("category")
+    for col in COLUNAS_NUMERICAS:
+        if col in df_produtos.columns:
+            df_produtos[col] = pd.to_numeric(df_produtos[col], errors="coerce").astype("float64")
+    return df_produtos
+
+
+def ler_catalogo(caminho):
+    df_produtos = pd.read_csv(caminho)
+    return tipar_catalogo(df_produtos)
+
+
+def assinatura_arquivo(caminho):
+    info = os.stat(caminho)
+    return (info.st_mtime_ns, info.st_size)
+
+
+def caminho_colunar(caminho_csv):
+    return os.path.splitext(caminho_csv)[0] + EXTENSAO_COLUNAR
+
+
+def substituir_pasta(pasta_nova, destino):
+    # Troca o diretório antigo pelo novo de uma vez
+    antigo = None
+    if os.path.exists(destino):
+        antigo = destino + ".antigo"
+        shutil.rmtree(antigo, ignore_errors=True)
+        os.rename(destino, antigo)
+    os.rename(pasta_nova, destino)
+    if antigo:
+        shutil.rmtree(antigo, ignore_errors=True)
+
+
+def compilar_catalogo(caminho_csv, destino=None):
+    # Converte o CSV num diretório de arrays NumPy (.npy), um por coluna:
+    # números em float32/float64 e Categoria/Descrição codificadas por dicionário
+    destino = destino or caminho_colunar(caminho_csv)
+    assinatura = assinatura_arquivo(caminho_csv)
+    df_produtos = ler_catalogo(caminho_csv)
+
+    pasta_temporaria = tempfile.mkdtemp(prefix=".compilando-", dir=os.path.dirname(os.path.abspath(destino)))
+    colunas = []
+    try:
+        for posicao, col in enumerate(df_produtos.columns):
+            arquivo = f"{posicao:02d}.npy"
+            serie = df_produtos[col]
+            if isinstance(serie.dtype, pd.CategoricalDtype):
+                np.save(os.path.join(pasta_temporaria, arquivo), serie.cat.codes.to_numpy(dtype="int32"))
+                colunas.append({"nome": col, "tipo": "dicionario", "arquivo": arquivo,
+                                "categorias": serie.cat.categories.astype(str).tolist()})
+            elif pd.api.types.is_numeric_dtype(serie):
+                # Preços ficam em float64 para não perder centavos; alíquotas cabem em float32
+                tipo = "float64" if col in COLUNAS_PRECO else "float32"
+                np.save(os.path.join(pasta_temporaria, arquivo), serie.to_numpy(dtype=tipo))
+                colunas.append({"nome": col, "tipo": tipo, "arquivo": arquivo})
+            else:
+                np.save(os.path.join(pasta_temporaria, arquivo), serie.astype(str).to_numpy(dtype=np.str_))
+                colunas.append({"nome": col, "tipo": "texto", "arquivo": arquivo})
+
+        manifesto = {
+            "versao": VERSAO_COLUNAR,
+            "linhas": len(df_produtos),
+            "origem": os.path.basename(caminho_csv),
+            "assinatura_origem": list(assinatura),
+            "colunas": colunas,
+        }
+        with open(os.path.join(pasta_temporaria, "manifesto.json"), "w", encoding="utf-8") as arquivo:
+            json.dump(manifesto, arquivo, ensure_ascii=False, indent=2)
+
+        substituir_pasta(pasta_temporaria, destino)
+    except Exception:
+        shutil.rmtree(pasta_temporaria, ignore_errors=True)
+        raise
+    return destino
+
+
+def ler_manifesto(pasta):
+    try:
+        with open(os.path.join(pasta, "manifesto.json"), encoding="utf-8") as arquivo:
+            manifesto = json.load(arquivo)
+    except FileNotFoundError:
+        return None
+    if manifesto.get("versao") != VERSAO_COLUNAR:
+        return None
+    return manifesto
+
+
+def ler_catalogo_colunar(pasta, manifesto=None):
+    manifesto = manifesto or ler_manifesto(pasta)
+    dados = {}
+    for coluna in manifesto["colunas"]:
+        # mmap: as páginas do arquivo são compartilhadas entre os processos do servidor
+        valores = np.load(os.path.join(pasta, coluna["arquivo"]), mmap_mode="r")
+        if coluna["tipo"] == "dicionario":
+            dados[coluna["nome"]] = pd.Categorical.from_codes(valores, coluna["categorias"])
+        elif coluna["tipo"] == "texto":
+            dados[coluna["nome"]] = valores.astype(object)
+        else:
+            dados[coluna["nome"]] = pd.Series(valores, copy=False)
+    return pd.DataFrame(dados, copy=False)
+
+
+def _assinatura_ou_nada(caminho):
+    try:
+        return assinatura_arquivo(caminho)
+    except FileNotFoundError:
+        return None
+
+
+def _assinatura_catalogo(caminho_csv):
+    # Só stat() nos dois arquivos; o manifesto é lido apenas quando algo muda
+    manifesto = os.path.join(caminho_colunar(caminho_csv), "manifesto.json")
+    assinatura = (_assinatura_ou_nada(caminho_csv), _assinatura_ou_nada(manifesto))
+    if assinatura == (None, None):
+        raise FileNotFoundError(caminho_csv)
+    return assinatura
+
+
+def _ler_origem_atualizada(caminho_csv, assinatura_csv):
+    # Usa o formato colunar quando ele foi compilado a partir da versão atual do CSV
+    pasta = caminho_colunar(caminho_csv)
+    manifesto = ler_manifesto(pasta)
+    if manifesto is not None and (assinatura_csv is None or tuple(manifesto["assinatura_origem"]) == assinatura_csv):
+        return ler_catalogo_colunar(pasta, manifesto)
+    if assinatura_csv is None:
+        raise FileNotFoundError(caminho_csv)
+    return ler_catalogo(caminho_csv)
+
+
+# Cache compartilhado pelo processo inteiro (todas as sessões do Streamlit)
+_catalogos = {}
+_trava = threading.Lock()
+
+
+def carregar_catalogo(caminho):
+    chave = os.path.abspath(caminho)
+    assinatura = _assinatura_catalogo(chave)
+
+    catalogo = _catalogos.get(chave)
+    if catalogo is not None and catalogo.assinatura == assinatura:
+        return catalogo
+
+    with _trava:
+        # Outra sessão pode ter recarregado enquanto esperávamos a trava
+        catalogo = _catalogos.get(chave)
+        if catalogo is not None and catalogo.assinatura == assinatura:
+            return catalogo
+
+        catalogo = Catalogo(_ler_origem_atualizada(chave, assinatura[0]), assinatura)
+        _catalogos[chave] = catalogo
+        return catalogo
+
+
+def limpar_cache():
+    with _trava:
+        _catalogos.clear()
+
+
+def liberar_catalogo(caminho):
+    # Sessões que ainda usam o catálogo ficam com ele; a próxima carga relê os arquivos
+    with _trava:
+        _catalogos.pop(os.path.abspath(caminho), None)
+
+
+if __name__ == "__main__":
+    # Uso: python catalogo.py database/produtos/produtos_completos_formatado.csv
+    for caminho_csv in sys.argv[1:]:
+        print(f"Catálogo compilado em {compilar_catalogo(caminho_csv)}")
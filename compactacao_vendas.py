@@ -0,0 +1,199 @@
+import argparse
+import json
+import os
+import re
+import time
+from datetime import date
+
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: trava de arquivo pelo msvcrt
+    fcntl = None
+    import msvcrt
+
+from carregador_vendas import MANIFESTO, PASTA_ARQUIVO, CarregadorVendas, ler_manifesto
+from registro_vendas import COLUNAS_VENDA, tipar_vendas
+
+# Junta os venda_*.csv e o vendas.csv de meses fechados numa partição Parquet
+# (zstd) por mês, em database/vendas/arquivo/, e remove os arquivos de origem.
+# O manifesto é a referência dos leitores: partições novas só passam a valer
+# quando ele é trocado (os.replace), e os arquivos de origem só são apagados
+# depois disso, então a compactação pode rodar com o app recebendo pedidos.
+# Uso: python compactacao_vendas.py database/vendas
+
+# Arquivos modificados há menos tempo podem estar sendo gravados
+IDADE_MINIMA = 10 * 60
+ARQUIVO_TRAVA = ".compactando"
+COMPRESSAO = "zstd"
+
+_MES = re.compile(r"^\d{4}-\d{2}$")
+
+
+def _travar(descritor):
+    # Trava do sistema operacional: é solta quando o processo termina, mesmo se for morto
+    try:
+        if fcntl is not None:
+            fcntl.flock(descritor, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(descritor, msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+def _gravar_manifesto(pasta_arquivo, manifesto):
+    caminho = os.path.join(pasta_arquivo, MANIFESTO)
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, "w", encoding="utf-8") as arquivo:
+        json.dump(manifesto, arquivo, ensure_ascii=False, indent=2)
+    os.replace(temporario, caminho)
+
+
+def _ler_origem(caminho):
+    try:
+        return pd.read_csv(caminho, encoding="utf-8-sig")
+    except pd.errors.EmptyDataError:
+        return pd.DataFrame(columns=COLUNAS_VENDA)
+
+
+def _motivos(df_origens, mes_aberto):
+    # Motivo, por arquivo de origem (nível "arquivo" do índice), para deixá-lo como está
+    meses = df_origens["Data da Compra"].astype("string").str.strip().str[:7]
+    problemas = pd.DataFrame({
+        "data da compra inválida": ~meses.fillna("").str.match(_MES),
+        "tem vendas do mês em aberto": (meses >= mes_aberto).fillna(False),
+    })
+    valores = df_origens[COLUNAS_VENDA[6:]].apply(pd.to_numeric, errors="coerce")
+    problemas["valores fora do tipo da coluna"] = (
+        (valores.isna() & df_origens[COLUNAS_VENDA[6:]].notna()).any(axis=1) | (valores["Quantidade"] % 1 != 0)
+    )
+    por_arquivo = problemas.groupby(level="arquivo", sort=False).any()
+    return por_arquivo.idxmax(axis=1).where(por_arquivo.any(axis=1))
+
+
+def _compactar(pasta, pasta_arquivo, mes_aberto, idade_minima):
+    manifesto = ler_manifesto(pasta)
+    compactados = manifesto["compactados"]
+    agora = time.time()
+
+    origens, ignorados, ja_compactados = {}, {}, []
+    frames = {}
+    for caminho, assinatura in sorted(CarregadorVendas(pasta).descobrir().items()):
+        if caminho.endswith(".parquet"):
+            continue
+        nome = os.path.basename(caminho)
+        if compactados.get(nome) == list(assinatura):
+            # Compactado numa execução interrompida antes da remoção
+            ja_compactados.append(caminho)
+            continue
+        if agora - assinatura[0] / 1e9 < idade_minima:
+            ignorados[nome] = "modificado recentemente"
+            continue
+
+        df_origem = _ler_origem(caminho)
+        faltando = [col for col in COLUNAS_VENDA if col not in df_origem.columns]
+        info = os.stat(caminho)
+        if (info.st_mtime_ns, info.st_size) != assinatura:
+            ignorados[nome] = "modificado durante a leitura"
+        elif faltando:
+            ignorados[nome] = f"colunas ausentes: {', '.join(faltando)}"
+        else:
+            origens[nome] = list(assinatura)
+            frames[nome] = df_origem[COLUNAS_VENDA]
+
+    # Arquivos pequenos só são lidos um a um; validação, tipos e meses saem de uma vez
+    por_mes = {}
+    if frames:
+        df_origens = pd.concat(frames, names=["arquivo", None])
+        motivos = _motivos(df_origens, mes_aberto).dropna()
+        for nome, motivo in motivos.items():
+            ignorados[nome] = motivo
+            del origens[nome]
+        df_novas = df_origens[~df_origens.index.get_level_values("arquivo").isin(motivos.index)]
+        df_novas = tipar_vendas(df_novas.reset_index(drop=True))
+        meses = df_novas["Data da Compra"].str.strip().str[:7]
+        por_mes = {mes: [df_mes] for mes, df_mes in df_novas.groupby(meses, sort=True)}
+
+    # Partições novas ganham um nome novo; as antigas continuam válidas até o manifesto mudar
+    geracao = manifesto["geracao"] + 1
+    particoes = dict(manifesto["particoes"])
+    substituidas = []
+    for mes, partes in sorted(por_mes.items()):
+        anterior = particoes.get(mes)
+        if anterior:
+            caminho_anterior = os.path.join(pasta_arquivo, anterior["arquivo"])
+            partes = [pd.read_parquet(caminho_anterior)] + partes
+            substituidas.append(caminho_anterior)
+        df_mes = tipar_vendas(pd.concat(partes, ignore_index=True))
+        df_mes = df_mes.sort_values("Data da Compra", kind="stable", ignore_index=True)
+
+        nome_particao = f"vendas_{mes}.{geracao:06d}.parquet"
+        temporario = os.path.join(pasta_arquivo, f".{nome_particao}.tmp")
+        df_mes.to_parquet(temporario, compression=COMPRESSAO, index=False)
+        os.replace(temporario, os.path.join(pasta_arquivo, nome_particao))
+        particoes[mes] = {"arquivo": nome_particao, "linhas": len(df_mes)}
+
+    if origens:
+        # Origens que já não existem saem do manifesto; as novas entram
+        compactados = {
+            nome: assinatura for nome, assinatura in compactados.items()
+            if os.path.exists(os.path.join(pasta, nome))
+        }
+        compactados.update(origens)
+        _gravar_manifesto(pasta_arquivo, {
+            "versao": manifesto["versao"],
+            "geracao": geracao,
+            "particoes": dict(sorted(particoes.items())),
+            "compactados": compactados,
+        })
+
+    # Daqui em diante os leitores já usam o manifesto novo
+    for caminho in ja_compactados + [os.path.join(pasta, nome) for nome in origens] + substituidas:
+        try:
+            os.remove(caminho)
+        except FileNotFoundError:
+            pass
+
+    return {
+        "arquivos": len(origens),
+        "linhas": sum(len(partes[0]) for partes in por_mes.values()),
+        "meses": sorted(por_mes),
+        "ignorados": ignorados,
+    }
+
+
+def compactar(pasta, hoje=None, idade_minima=IDADE_MINIMA):
+    pasta_arquivo = os.path.join(pasta, PASTA_ARQUIVO)
+    os.makedirs(pasta_arquivo, exist_ok=True)
+    mes_aberto = (hoje or date.today()).strftime("%Y-%m")
+
+    # Uma compactação por vez. O arquivo da trava fica na pasta; quem trava é o
+    # sistema operacional, então um processo morto não deixa a pasta bloqueada
+    trava = os.path.join(pasta_arquivo, ARQUIVO_TRAVA)
+    descritor = os.open(trava, os.O_CREAT | os.O_RDWR)
+    try:
+        if not _travar(descritor):
+            raise RuntimeError(f"Outra compactação está em andamento (trava em {trava}).")
+        return _compactar(pasta, pasta_arquivo, mes_aberto, idade_minima)
+    finally:
+        # Fechar o descritor solta a trava
+        os.close(descritor)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compacta as vendas de meses fechados em partições mensais.")
+    parser.add_argument("pasta", nargs="?", default="database/vendas")
+    parser.add_argument("--idade-minima", type=float, default=IDADE_MINIMA, help="segundos desde a última modificação")
+    args = parser.parse_args()
+
+    resumo = compactar(args.pasta, idade_minima=args.idade_minima)
+    print(f"{resumo['arquivos']} arquivos ({resumo['linhas']} vendas) compactados em {len(resumo['meses'])} meses.")
+    for nome, motivo in sorted(resumo["ignorados"].items()):
+        print(f"  mantido {nome}: {motivo}")
+
+
+if __name__ == "__main__":
+    main()
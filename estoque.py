@@ -0,0 +1,220 @@
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+import pandas as pd
+
+# Estoque por produto com reservas temporárias dos carrinhos.
+# Produtos sem linha na tabela de estoque não têm controle (venda livre).
+
+TEMPO_RESERVA = 30 * 60
+INTERVALO_LIMPEZA = 5
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS estoque (
+    produto TEXT PRIMARY KEY,
+    quantidade INTEGER NOT NULL CHECK (quantidade >= 0),
+    reservado INTEGER NOT NULL DEFAULT 0 CHECK (reservado >= 0 AND reservado <= quantidade)
+);
+
+CREATE TABLE IF NOT EXISTS reservas (
+    sessao TEXT NOT NULL,
+    produto TEXT NOT NULL REFERENCES estoque(produto),
+    quantidade INTEGER NOT NULL CHECK (quantidade > 0),
+    expira_em REAL NOT NULL,
+    PRIMARY KEY (sessao, produto)
+);
+
+CREATE INDEX IF NOT EXISTS reservas_expira_em ON reservas (expira_em);
+"""
+
+
+class EstoqueInsuficiente(ValueError):
+    def __init__(self, produto, disponivel):
+        super().__init__(f"Estoque insuficiente para {produto}: {disponivel} disponível(is).")
+        self.produto = produto
+        self.disponivel = disponivel
+
+
+class Estoque:
+    def __init__(self, caminho, tempo_reserva=TEMPO_RESERVA):
+        self.caminho = caminho
+        self.tempo_reserva = tempo_reserva
+        pasta = os.path.dirname(caminho)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+
+        # Mesmo arranjo do registro de vendas: uma conexão por processo, trava
+        # entre as sessões do processo e BEGIN IMMEDIATE entre processos
+        self._trava = threading.Lock()
+        self._conexao = sqlite3.connect(caminho, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.execute("PRAGMA synchronous=NORMAL")
+        self._conexao.execute("PRAGMA busy_timeout=30000")
+        self._conexao.executescript(_ESQUEMA)
+        self._ultima_limpeza = 0.0
+
+    def _transacao(self, funcao, *args):
+        with self._trava:
+            cursor = self._conexao.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                resultado = funcao(cursor, *args)
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+            return resultado
+
+    def _liberar_expiradas(self, cursor, agora):
+        # Devolve ao disponível as reservas vencidas (no máximo a cada poucos segundos)
+        if agora - self._ultima_limpeza < INTERVALO_LIMPEZA:
+            return
+        cursor.execute(
+            "UPDATE estoque SET reservado = reservado - ("
+            "    SELECT SUM(r.quantidade) FROM reservas r WHERE r.produto = estoque.produto AND r.expira_em <= ?"
+            ") WHERE produto IN (SELECT produto FROM reservas WHERE expira_em <= ?)",
+            (agora, agora),
+        )
+        cursor.execute("DELETE FROM reservas WHERE expira_em <= ?", (agora,))
+        self._ultima_limpeza = agora
+
+    def _disponivel(self, cursor, produto):
+        linha = cursor.execute("SELECT quantidade - reservado FROM estoque WHERE produto = ?", (produto,)).fetchone()
+        return None if linha is None else linha[0]
+
+    def _reservar(self, cursor, sessao, itens):
+        agora = time.time()
+        self._liberar_expiradas(cursor, agora)
+        expira_em = agora + self.tempo_reserva
+
+        faltas = {}
+        for produto, quantidade in itens:
+            # Decremento condicional: a checagem e a alteração são um único UPDATE
+            cursor.execute(
+                "UPDATE estoque SET reservado = reservado + ? WHERE produto = ? AND quantidade - reservado >= ?",
+                (quantidade, produto, quantidade),
+            )
+            if cursor.rowcount == 0:
+                disponivel = self._disponivel(cursor, produto)
+                if disponivel is not None:
+                    faltas[produto] = disponivel
+                continue
+            cursor.execute(
+                "INSERT INTO reservas (sessao, produto, quantidade, expira_em) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(sessao, produto) DO UPDATE SET quantidade = quantidade + excluded.quantidade",
+                (sessao, produto, quantidade, expira_em),
+            )
+        # Qualquer inclusão renova o prazo do carrinho inteiro
+        cursor.execute("UPDATE reservas SET expira_em = ? WHERE sessao = ?", (expira_em, sessao))
+        return faltas
+
+    def reservar(self, sessao, produto, quantidade):
+        # Retorna o disponível após a reserva, ou None se o produto não tem controle de estoque
+        faltas = self._transacao(self._reservar, sessao, [(produto, int(quantidade))])
+        if produto in faltas:
+            raise EstoqueInsuficiente(produto, faltas[produto])
+        return self.disponivel(produto)
+
+    def reservar_lote(self, sessao, itens):
+        # Reserva o que houver em estoque numa só transação; retorna produto -> disponível dos que faltaram
+        return self._transacao(self._reservar, sessao, [(produto, int(quantidade)) for produto, quantidade in itens])
+
+    def _liberar(self, cursor, sessao, produtos=None):
+        if produtos is None:
+            produtos = [linha[0] for linha in cursor.execute("SELECT produto FROM reservas WHERE sessao = ?", (sessao,))]
+        for produto in produtos:
+            linha = cursor.execute(
+                "DELETE FROM reservas WHERE sessao = ? AND produto = ? RETURNING quantidade", (sessao, produto)
+            ).fetchone()
+            if linha is not None:
+                cursor.execute("UPDATE estoque SET reservado = reservado - ? WHERE produto = ?", (linha[0], produto))
+
+    def liberar(self, sessao, produtos=None):
+        self._transacao(self._liberar, sessao, produtos)
+
+    def _confirmar(self, cursor, sessao, itens):
+        self._liberar_expiradas(cursor, time.time())
+        # A reserva da sessão volta ao disponível e a baixa é feita sobre ele,
+        # então uma reserva vencida ainda passa se houver estoque livre.
+        # Sem sessão (pedidos da API), a baixa é direta
+        if sessao is not None:
+            self._liberar(cursor, sessao, [produto for produto, _ in itens])
+        for produto, quantidade in itens:
+            cursor.execute(
+                "UPDATE estoque SET quantidade = quantidade - ? WHERE produto = ? AND quantidade - reservado >= ?",
+                (quantidade, produto, quantidade),
+            )
+            if cursor.rowcount == 0:
+                disponivel = self._disponivel(cursor, produto)
+                if disponivel is not None:
+                    raise EstoqueInsuficiente(produto, disponivel)
+        if sessao is not None:
+            self._liberar(cursor, sessao)
+
+    def confirmar(self, sessao, itens):
+        # Baixa atômica de todos os itens do pedido: ou todos ou nenhum
+        self._transacao(self._confirmar, sessao, [(produto, int(quantidade)) for produto, quantidade in itens])
+
+    def _devolver(self, cursor, itens):
+        cursor.executemany("UPDATE estoque SET quantidade = quantidade + ? WHERE produto = ?",
+                           [(int(quantidade), produto) for produto, quantidade in itens])
+
+    def devolver(self, itens):
+        # Desfaz uma baixa (ex.: o pedido não pôde ser gravado no registro de vendas)
+        self._transacao(self._devolver, itens)
+
+    def disponivel(self, produto):
+        with self._trava:
+            return self._disponivel(self._conexao, produto)
+
+    def _definir(self, cursor, quantidades):
+        cursor.executemany(
+            "INSERT INTO estoque (produto, quantidade) VALUES (?, ?) "
+            "ON CONFLICT(produto) DO UPDATE SET quantidade = MAX(excluded.quantidade, estoque.reservado)",
+            quantidades,
+        )
+
+    def definir_estoque(self, quantidades):
+        # quantidades: pares (produto, quantidade em estoque)
+        self._transacao(self._definir, [(produto, int(quantidade)) for produto, quantidade in quantidades])
+
+    def ler_estoque(self):
+        with self._trava:
+            return pd.read_sql_query(
+                'SELECT produto AS "Produto", quantidade AS "Estoque", reservado AS "Reservado", '
+                'quantidade - reservado AS "Disponível" FROM estoque ORDER BY produto',
+                self._conexao,
+            )
+
+    def fechar(self):
+        with self._trava:
+            self._conexao.close()
+
+
+# Um estoque por arquivo, compartilhado por todas as sessões do processo
+_estoques = {}
+_trava_estoques = threading.Lock()
+
+
+def abrir_estoque(caminho):
+    chave = os.path.abspath(caminho)
+    with _trava_estoques:
+        estoque = _estoques.get(chave)
+        if estoque is None:
+            estoque = Estoque(chave)
+            _estoques[chave] = estoque
+        return estoque
+
+
+if __name__ == "__main__":
+    # Uso: python estoque.py database/produtos/estoque.db estoque.csv
+    # O CSV precisa das colunas "Nome do Produto" e "Estoque Disponível"
+    caminho_db, caminho_csv = sys.argv[1:3]
+    df_estoque = pd.read_csv(caminho_csv)
+    abrir_estoque(caminho_db).definir_estoque(
+        zip(df_estoque["Nome do Produto"], df_estoque["Estoque Disponível"])
+    )
+    print(f"Estoque de {len(df_estoque)} produtos carregado em {caminho_db}")
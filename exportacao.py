@@ -0,0 +1,136 @@
+import importlib.util
+import io
+
+import pandas as pd
+
+from registro_vendas import COLUNAS_VENDA, tipar_vendas
+
+# Exportação de pedidos e relatórios de vendas em CSV, XLSX ou Parquet. Os
+# dados chegam em lotes (DataFrames) e cada lote é escrito e descartado antes
+# do próximo: o relatório inteiro nunca existe como um único DataFrame.
+
+TAMANHO_LOTE = 50_000
+
+# formato -> (rótulo, tipo MIME, pacote opcional necessário)
+FORMATOS = {
+    "csv": ("CSV", "text/csv", None),
+    "xlsx": ("Excel", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "openpyxl"),
+    "parquet": ("Parquet", "application/vnd.apache.parquet", "pyarrow"),
+}
+# Linhas de dados por planilha do Excel (o limite é 1.048.576 com o cabeçalho)
+LINHAS_XLSX = 1_048_575
+
+
+def formatos_disponiveis():
+    return [
+        formato for formato, (_, _, pacote) in FORMATOS.items()
+        if pacote is None or importlib.util.find_spec(pacote) is not None
+    ]
+
+
+def rotulo(formato):
+    return FORMATOS[formato][0]
+
+
+def tipo_mime(formato):
+    return FORMATOS[formato][1]
+
+
+def filtrar_lote(lote, desde=None, ate=None, empresas=None, categorias=None):
+    mascara = pd.Series(True, index=lote.index)
+    if desde is not None or ate is not None:
+        datas = lote["Data da Compra"].astype("string").str[:10]
+        if desde is not None:
+            mascara &= datas >= desde
+        if ate is not None:
+            mascara &= datas <= ate
+    if empresas:
+        mascara &= lote["Empresa"].isin(empresas)
+    if categorias:
+        mascara &= lote["Categoria"].isin(categorias)
+    return lote[mascara.fillna(False)]
+
+
+def lotes_dataframe(df, desde=None, ate=None, empresas=None, categorias=None, tamanho_lote=TAMANHO_LOTE):
+    # Fatias de um DataFrame já em memória; o filtro é aplicado fatia a fatia
+    for inicio in range(0, len(df), tamanho_lote):
+        lote = filtrar_lote(df.iloc[inicio:inicio + tamanho_lote], desde, ate, empresas, categorias)
+        if not lote.empty:
+            yield lote
+
+
+def _escrever_csv(lotes, destino, colunas):
+    cabecalho = True
+    for lote in lotes:
+        destino.write(lote.to_csv(index=False, header=cabecalho).encode("utf-8"))
+        cabecalho = False
+    if cabecalho:
+        destino.write(pd.DataFrame(columns=colunas).to_csv(index=False).encode("utf-8"))
+
+
+def _escrever_xlsx(lotes, destino, colunas):
+    try:
+        from openpyxl import Workbook
+    except ImportError:
+        raise ValueError("Exportação em Excel requer o pacote openpyxl; exporte em CSV.")
+
+    # Modo write_only: as linhas vão direto para o arquivo, sem montar a planilha em memória
+    pasta = Workbook(write_only=True)
+    planilha, linhas = None, LINHAS_XLSX
+    for lote in lotes:
+        lote = lote.astype(object).where(lote.notna(), None)
+        for linha in lote.itertuples(index=False, name=None):
+            if linhas == LINHAS_XLSX:
+                planilha = pasta.create_sheet(f"Vendas {len(pasta.worksheets) + 1}" if planilha else "Vendas")
+                planilha.append(list(lote.columns))
+                linhas = 0
+            planilha.append(linha)
+            linhas += 1
+    if planilha is None:
+        pasta.create_sheet("Vendas").append(list(colunas))
+    pasta.save(destino)
+
+
+def _escrever_parquet(lotes, destino, colunas):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Exportação em Parquet requer o pacote pyarrow; exporte em CSV.")
+
+    # Cada lote vira um row group; o esquema é o do primeiro lote
+    escritor = None
+    try:
+        for lote in lotes:
+            tabela = pa.Table.from_pandas(lote, preserve_index=False)
+            if escritor is None:
+                escritor = pq.ParquetWriter(destino, tabela.schema)
+            escritor.write_table(tabela.cast(escritor.schema))
+        if escritor is None:
+            vazio = tipar_vendas(pd.DataFrame(columns=colunas))
+            pq.write_table(pa.Table.from_pandas(vazio, preserve_index=False), destino)
+    finally:
+        if escritor is not None:
+            escritor.close()
+
+
+_ESCRITORES = {"csv": _escrever_csv, "xlsx": _escrever_xlsx, "parquet": _escrever_parquet}
+
+
+def exportar(lotes, formato, destino=None, colunas=COLUNAS_VENDA):
+    # destino: arquivo binário aberto; sem destino, devolve os bytes gerados
+    if formato not in _ESCRITORES:
+        raise ValueError(f"Formato de exportação desconhecido: {formato}")
+    # Colunas na ordem de `colunas` e tipos fixos: lotes de origens diferentes
+    # (registro, CSVs antigos) saem com o mesmo esquema, o que o Parquet exige
+    lotes = (tipar_vendas(lote.reindex(columns=colunas)) for lote in lotes)
+    if destino is not None:
+        _ESCRITORES[formato](lotes, destino, colunas)
+        return destino
+    buffer = io.BytesIO()
+    _ESCRITORES[formato](lotes, buffer, colunas)
+    return buffer.getvalue()
+
+
+def exportar_dataframe(df, formato):
+    return exportar(lotes_dataframe(df), formato, colunas=list(df.columns))
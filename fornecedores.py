@@ -0,0 +1,113 @@
+import json
+import os
+import threading
+import time
+
+from pedido import ENCARGO_PERCENTUAL
+
+# Fornecedores atendidos pelo mesmo processo. Cada um tem catálogo, vendas,
+# estoque e encargo próprios; os caches dos serviços são separados pelos
+# caminhos dos arquivos, então fornecedores com o mesmo catálogo dividem a mesma
+# cópia em memória. O fornecedor vem da URL (?fornecedor=2a) ou do padrão da
+# configuração, lida de fornecedores.json (ou do arquivo em FORNECEDORES_CONFIG):
+#   {
+#     "padrao": "2b",
+#     "fornecedores": {
+#       "2a": {"nome": "Fornecedor 2ºA", "pasta": "database/fornecedor_2a", "encargo_percentual": 0.2},
+#       "2b": {"nome": "Fornecedor 2ºB", "pasta": "database", "email": "grupofornecedores2b@gmail.com"}
+#     }
+#   }
+# "pasta" segue o layout de database/; "produtos", "vendas" e "estoque" trocam um caminho só.
+
+CONFIG_PATH = os.environ.get("FORNECEDORES_CONFIG", "fornecedores.json")
+PARAMETRO_URL = "fornecedor"
+ARQUIVO_PRODUTOS = "produtos_completos_formatado.csv"
+# Fornecedor sem acesso há esse tempo tem os caches de leitura liberados
+OCIOSIDADE_MAXIMA = 30 * 60
+
+# Sem arquivo de configuração: só o fornecedor que este app sempre atendeu
+CONFIG_PADRAO = {
+    "padrao": "2b",
+    "fornecedores": {
+        "2b": {"nome": "Fornecedor 2ºB", "pasta": "database", "email": "grupofornecedores2b@gmail.com"},
+    },
+}
+
+
+class Fornecedor:
+    def __init__(self, chave, nome, pasta="database", produtos=None, vendas=None, estoque=None,
+                 encargo_percentual=ENCARGO_PERCENTUAL, email=None):
+        if not 0 <= encargo_percentual < 1:
+            raise ValueError(f"Fornecedor {chave}: encargo_percentual deve estar entre 0 e 1 (ex.: 0.2 para 20%).")
+        self.chave = chave
+        self.nome = nome
+        self.produtos_path = produtos or os.path.join(pasta, "produtos", ARQUIVO_PRODUTOS)
+        self.vendas_dir = vendas or os.path.join(pasta, "vendas")
+        self.vendas_db_path = os.path.join(self.vendas_dir, "vendas.db")
+        self.estoque_db_path = estoque or os.path.join(pasta, "produtos", "estoque.db")
+        self.encargo_percentual = encargo_percentual
+        self.email = email
+        # Momento do último acesso; None enquanto os caches não estão carregados
+        self.ultimo_acesso = None
+
+
+class Fornecedores:
+    def __init__(self, config, ociosidade_maxima=OCIOSIDADE_MAXIMA):
+        self.ociosidade_maxima = config.get("ociosidade_maxima", ociosidade_maxima)
+        self.por_chave = {}
+        for chave, dados in config.get("fornecedores", {}).items():
+            try:
+                self.por_chave[chave] = Fornecedor(chave, **dados)
+            except TypeError as e:
+                raise ValueError(f"Configuração inválida do fornecedor {chave}: {e}")
+        if not self.por_chave:
+            raise ValueError("Nenhum fornecedor configurado.")
+        self.padrao = config.get("padrao") or next(iter(self.por_chave))
+        if self.padrao not in self.por_chave:
+            raise ValueError(f"Fornecedor padrão desconhecido: {self.padrao}")
+        self._trava = threading.Lock()
+
+    def obter(self, chave=None):
+        fornecedor = self.por_chave.get(chave or self.padrao)
+        if fornecedor is None:
+            raise ValueError(f"Fornecedor desconhecido: {chave}")
+        return fornecedor
+
+    def registrar_acesso(self, fornecedor, agora=None):
+        # Marca o acesso e devolve os fornecedores que ficaram ociosos desde a última vez
+        agora = time.monotonic() if agora is None else agora
+        with self._trava:
+            fornecedor.ultimo_acesso = agora
+            ociosos = [
+                outro for outro in self.por_chave.values()
+                if outro.ultimo_acesso is not None and agora - outro.ultimo_acesso > self.ociosidade_maxima
+            ]
+            for outro in ociosos:
+                outro.ultimo_acesso = None
+            return ociosos
+
+    def ativos(self):
+        return [fornecedor for fornecedor in self.por_chave.values() if fornecedor.ultimo_acesso is not None]
+
+
+def ler_config(caminho=CONFIG_PATH):
+    try:
+        with open(caminho, encoding="utf-8") as arquivo:
+            return json.load(arquivo)
+    except FileNotFoundError:
+        return CONFIG_PADRAO
+
+
+# Configuração lida uma vez por processo
+_fornecedores = {}
+_trava_fornecedores = threading.Lock()
+
+
+def carregar_fornecedores(caminho=CONFIG_PATH):
+    chave = os.path.abspath(caminho)
+    with _trava_fornecedores:
+        fornecedores = _fornecedores.get(chave)
+        if fornecedores is None:
+            fornecedores = Fornecedores(ler_config(chave))
+            _fornecedores[chave] = fornecedores
+        return fornecedores
@@ -0,0 +1,211 @@
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from catalogo import COLUNA_NOME, COLUNAS_PRECO, VERSAO_COLUNAR, assinatura_arquivo, caminho_colunar, substituir_pasta
+from precificacao import COLUNA_BASE, COLUNA_CATEGORIA, COLUNA_FINAL, COLUNAS_ALIQUOTA, calcular_precos_finais
+
+# Gera catálogos sintéticos no layout de produtos_completos_formatado.csv,
+# em blocos vetorizados com NumPy: a memória usada depende do tamanho do
+# bloco, não do total de produtos.
+# Uso: python gerador_catalogo.py 1000000 database/produtos/produtos_teste.csv --formato ambos
+
+# Categoria -> faixa do preço base (R$), a mesma do catálogo atual
+CATEGORIAS = {
+    "Caixa de Som": (130, 660),
+    "Controlador RGB": (70, 300),
+    "Cooler": (58, 300),
+    "Estabilizador": (150, 515),
+    "Fonte": (230, 995),
+    "Gabinete": (170, 790),
+    "HD": (235, 695),
+    "Headset": (190, 960),
+    "Hub USB": (43, 192),
+    "Memória RAM": (153, 797),
+    "Monitor": (514, 3000),
+    "Mouse": (64, 578),
+    "Mousepad": (37, 189),
+    "No-break": (443, 1950),
+    "Placa de Vídeo": (1304, 6970),
+    "Placa-mãe": (310, 1980),
+    "Processador": (588, 3950),
+    "SSD": (158, 778),
+    "Suporte Monitor": (112, 397),
+    "Teclado": (83, 796),
+    "Water Cooler": (332, 1360),
+    "Webcam": (106, 599),
+}
+PALAVRAS = [
+    "Accusamus", "Adipisci", "Aliquam", "Amet", "Aperiam", "Architecto", "Asperiores", "Beatae",
+    "Blanditiis", "Consectetur", "Corporis", "Culpa", "Cumque", "Debitis", "Delectus", "Deserunt",
+    "Dicta", "Dolor", "Dolore", "Eius", "Eligendi", "Eos", "Error", "Esse", "Eveniet", "Excepturi",
+    "Expedita", "Facere", "Fugiat", "Harum", "Impedit", "Ipsum", "Itaque", "Iusto", "Laborum", "Libero",
+    "Magnam", "Maxime", "Minima", "Mollitia", "Nemo", "Nesciunt", "Nihil", "Nobis", "Numquam", "Odio",
+    "Officia", "Omnis", "Optio", "Pariatur", "Placeat", "Possimus", "Quae", "Quidem", "Quisquam",
+    "Ratione", "Repellat", "Rerum", "Saepe", "Sapiente", "Sequi", "Soluta", "Tempora", "Tenetur",
+    "Totam", "Unde", "Velit", "Veritatis", "Vero", "Vitae", "Voluptas", "Voluptates",
+]
+FRASES = [
+    "com desempenho confiável, ideal para setups gamers e profissionais.",
+    "com ótimo custo-benefício para o dia a dia.",
+    "de alta durabilidade, com garantia estendida.",
+    "compacto, silencioso e fácil de instalar.",
+]
+# Faixas das alíquotas (%), na ordem de COLUNAS_ALIQUOTA
+FAIXAS_ALIQUOTA = [(5, 20), (12, 18), (0, 15)]
+
+COLUNAS_CATALOGO = [COLUNA_NOME, COLUNA_CATEGORIA, "Descrição", COLUNA_BASE, *COLUNAS_ALIQUOTA, COLUNA_FINAL]
+TAMANHO_BLOCO = 200_000
+
+_NOMES_CATEGORIA = np.array(list(CATEGORIAS))
+_FAIXAS = np.array(list(CATEGORIAS.values()), dtype="float64")
+# Prefixos "Categoria Palavra " de todos os nomes; o número sequencial torna cada nome único
+_PREFIXOS = np.array([f"{categoria} {palavra} " for categoria in CATEGORIAS for palavra in PALAVRAS])
+# Descrições por dicionário: código = categoria * len(FRASES) + frase
+DESCRICOES = [f"{categoria} {frase}" for categoria in CATEGORIAS for frase in FRASES]
+
+
+def _gerar_bloco(inicio, linhas, rng):
+    codigos_categoria = rng.integers(0, len(_NOMES_CATEGORIA), linhas)
+    codigos_palavra = rng.integers(0, len(PALAVRAS), linhas)
+    numeros = np.arange(inicio + 1, inicio + linhas + 1).astype(str)
+    nomes = np.char.add(_PREFIXOS[codigos_categoria * len(PALAVRAS) + codigos_palavra], numeros)
+    codigos_descricao = codigos_categoria * len(FRASES) + rng.integers(0, len(FRASES), linhas)
+
+    # Preço base log-uniforme dentro da faixa da categoria
+    minimos, maximos = _FAIXAS[codigos_categoria, 0], _FAIXAS[codigos_categoria, 1]
+    precos_base = np.round(np.exp(rng.uniform(np.log(minimos), np.log(maximos))), 2)
+    aliquotas = np.column_stack([np.round(rng.uniform(a, b, linhas), 2) for a, b in FAIXAS_ALIQUOTA])
+    return {
+        COLUNA_NOME: nomes,
+        COLUNA_CATEGORIA: codigos_categoria.astype("int32"),
+        "Descrição": codigos_descricao.astype("int32"),
+        COLUNA_BASE: precos_base,
+        **{col: aliquotas[:, i] for i, col in enumerate(COLUNAS_ALIQUOTA)},
+        COLUNA_FINAL: calcular_precos_finais(precos_base, aliquotas),
+    }
+
+
+def gerar_blocos(total, tamanho_bloco=TAMANHO_BLOCO, semente=0):
+    # Blocos como dicts de arrays; categoria e descrição vêm como códigos de dicionário
+    rng = np.random.default_rng(semente)
+    for inicio in range(0, total, tamanho_bloco):
+        yield inicio, _gerar_bloco(inicio, min(tamanho_bloco, total - inicio), rng)
+
+
+def bloco_para_dataframe(bloco):
+    df_bloco = pd.DataFrame(bloco, columns=COLUNAS_CATALOGO)
+    df_bloco[COLUNA_CATEGORIA] = pd.Categorical.from_codes(bloco[COLUNA_CATEGORIA], _NOMES_CATEGORIA)
+    df_bloco["Descrição"] = pd.Categorical.from_codes(bloco["Descrição"], DESCRICOES)
+    return df_bloco
+
+
+def gerar_catalogo(total, semente=0, tamanho_bloco=TAMANHO_BLOCO):
+    # Catálogo inteiro em memória (para testes e benchmarks)
+    return pd.concat(
+        [bloco_para_dataframe(bloco) for _, bloco in gerar_blocos(total, tamanho_bloco, semente)],
+        ignore_index=True,
+    )
+
+
+def _largura_nome(total):
+    return max(len(prefixo) for prefixo in _PREFIXOS) + len(str(total))
+
+
+class _EscritorColunar:
+    # Grava direto nos .npy finais (memmap), no mesmo formato de catalogo.compilar_catalogo
+    def __init__(self, destino, total):
+        self.destino = destino
+        self.total = total
+        self.pasta = tempfile.mkdtemp(prefix=".gerando-", dir=os.path.dirname(os.path.abspath(destino)))
+        self.colunas = []
+        self._arrays = {}
+        for posicao, col in enumerate(COLUNAS_CATALOGO):
+            arquivo = f"{posicao:02d}.npy"
+            if col == COLUNA_NOME:
+                tipo, dtype = "texto", f"<U{_largura_nome(total)}"
+            elif col in (COLUNA_CATEGORIA, "Descrição"):
+                tipo, dtype = "dicionario", "int32"
+            else:
+                tipo = dtype = "float64" if col in COLUNAS_PRECO else "float32"
+            self._arrays[col] = np.lib.format.open_memmap(
+                os.path.join(self.pasta, arquivo), mode="w+", dtype=dtype, shape=(total,)
+            )
+            coluna = {"nome": col, "tipo": tipo, "arquivo": arquivo}
+            if col == COLUNA_CATEGORIA:
+                coluna["categorias"] = _NOMES_CATEGORIA.tolist()
+            elif col == "Descrição":
+                coluna["categorias"] = DESCRICOES
+            self.colunas.append(coluna)
+
+    def escrever(self, inicio, bloco):
+        fim = inicio + len(bloco[COLUNA_NOME])
+        for col, valores in bloco.items():
+            self._arrays[col][inicio:fim] = valores
+
+    def concluir(self, origem, assinatura_origem):
+        for array in self._arrays.values():
+            array.flush()
+        self._arrays.clear()
+        manifesto = {
+            "versao": VERSAO_COLUNAR,
+            "linhas": self.total,
+            "origem": origem,
+            "assinatura_origem": list(assinatura_origem),
+            "colunas": self.colunas,
+        }
+        with open(os.path.join(self.pasta, "manifesto.json"), "w", encoding="utf-8") as arquivo:
+            json.dump(manifesto, arquivo, ensure_ascii=False, indent=2)
+        substituir_pasta(self.pasta, self.destino)
+
+
+def gerar_arquivos(total, caminho_csv, formato="csv", tamanho_bloco=TAMANHO_BLOCO, semente=0):
+    # formato: "csv", "colunar" (pasta <csv sem extensão>.colunar) ou "ambos"
+    gravar_csv = formato in ("csv", "ambos")
+    colunar = _EscritorColunar(caminho_colunar(caminho_csv), total) if formato in ("colunar", "ambos") else None
+
+    temporario_csv = f"{caminho_csv}.{os.getpid()}.tmp"
+    try:
+        for inicio, bloco in gerar_blocos(total, tamanho_bloco, semente):
+            if gravar_csv:
+                bloco_para_dataframe(bloco).to_csv(
+                    temporario_csv, mode="a" if inicio else "w", header=not inicio, index=False
+                )
+            if colunar:
+                colunar.escrever(inicio, bloco)
+        if gravar_csv:
+            os.replace(temporario_csv, caminho_csv)
+        if colunar:
+            # Com o CSV junto, o manifesto aponta para ele e o carregar_catalogo usa a pasta colunar
+            assinatura = assinatura_arquivo(caminho_csv) if gravar_csv else ()
+            colunar.concluir(os.path.basename(caminho_csv), assinatura)
+    except BaseException:
+        if os.path.exists(temporario_csv):
+            os.remove(temporario_csv)
+        if colunar and os.path.exists(colunar.pasta):
+            shutil.rmtree(colunar.pasta, ignore_errors=True)
+        raise
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera um catálogo sintético de produtos")
+    parser.add_argument("produtos", type=int, help="quantidade de produtos")
+    parser.add_argument("saida", help="caminho do CSV (a pasta colunar fica ao lado, com extensão .colunar)")
+    parser.add_argument("--formato", choices=["csv", "colunar", "ambos"], default="csv")
+    parser.add_argument("--bloco", type=int, default=TAMANHO_BLOCO, help="produtos por bloco")
+    parser.add_argument("--semente", type=int, default=0)
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    gerar_arquivos(args.produtos, args.saida, args.formato, args.bloco, args.semente)
+    print(f"{args.produtos} produtos gerados em {time.perf_counter() - inicio:.1f} s ({args.formato})")
+
+
+if __name__ == "__main__":
+    main()
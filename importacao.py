@@ -0,0 +1,108 @@
+import io
+import os
+
+import pandas as pd
+
+from busca import tokenizar
+from catalogo import COLUNA_NOME
+from moeda import para_centavos
+from pedido import QUANTIDADE_MAXIMA
+
+# Nomes aceitos para as colunas da planilha (comparados sem acento e sem caixa)
+COLUNAS_PRODUTO = {"produto", "nome do produto", "nome", "item"}
+COLUNAS_QUANTIDADE = {"quantidade", "qtd", "qtde", "quant"}
+
+
+def _normalizar_coluna(nome):
+    return " ".join(tokenizar(nome))
+
+
+def ler_planilha(conteudo, nome_arquivo):
+    extensao = os.path.splitext(nome_arquivo)[1].lower()
+    if extensao == ".xls":
+        # O formato antigo do Excel precisaria do xlrd, que o projeto não usa
+        raise ValueError("Planilhas .xls não são aceitas; salve como .xlsx ou CSV.")
+    if extensao == ".xlsx":
+        try:
+            return pd.read_excel(io.BytesIO(conteudo))
+        except ImportError:
+            raise ValueError("Leitura de Excel requer o pacote openpyxl; envie a planilha em CSV.")
+
+    # CSV exportado do Excel em português costuma vir com ";"
+    primeira_linha = conteudo.split(b"\n", 1)[0]
+    separador = ";" if primeira_linha.count(b";") > primeira_linha.count(b",") else ","
+    return pd.read_csv(io.BytesIO(conteudo), sep=separador, encoding="utf-8-sig")
+
+
+def _localizar_coluna(df_planilha, aceitas, descricao):
+    for coluna in df_planilha.columns:
+        if _normalizar_coluna(coluna) in aceitas:
+            return coluna
+    raise ValueError(f"A planilha precisa de uma coluna de {descricao} (ex.: {sorted(aceitas)[0].title()}).")
+
+
+def precificar_planilha(df_planilha, catalogo):
+    coluna_produto = _localizar_coluna(df_planilha, COLUNAS_PRODUTO, "produto")
+    coluna_quantidade = _localizar_coluna(df_planilha, COLUNAS_QUANTIDADE, "quantidade")
+
+    produtos = df_planilha[coluna_produto].astype("string").str.strip()
+    quantidades = pd.to_numeric(df_planilha[coluna_quantidade], errors="coerce")
+
+    # Junção com o catálogo pelo índice nome -> linha, de uma vez para a planilha inteira
+    linhas = produtos.map(catalogo.indice)
+
+    motivos = pd.Series(pd.NA, index=df_planilha.index, dtype="string")
+    motivos = motivos.mask(
+        quantidades.isna() | (quantidades <= 0) | (quantidades % 1 != 0) | (quantidades > QUANTIDADE_MAXIMA),
+        "quantidade inválida",
+    )
+    motivos = motivos.mask(linhas.isna(), "produto não encontrado no catálogo")
+    motivos = motivos.mask(produtos.isna() | (produtos == ""), "produto em branco")
+
+    rejeitados = motivos.notna()
+    df_rejeitados = pd.DataFrame({
+        "Linha": df_planilha.index[rejeitados] + 2,
+        "Produto": df_planilha.loc[rejeitados, coluna_produto],
+        "Quantidade": df_planilha.loc[rejeitados, coluna_quantidade],
+        "Motivo": motivos[rejeitados],
+    })
+
+    # Linhas repetidas do mesmo produto viram um item só
+    df_validos = pd.DataFrame({
+        "linha": linhas[~rejeitados].astype("int64"),
+        "Quantidade": quantidades[~rejeitados].astype("int64"),
+    })
+    df_itens = df_validos.groupby("linha", sort=False, as_index=False)["Quantidade"].sum()
+
+    posicoes = df_itens["linha"].to_numpy()
+    df_produtos = catalogo.df
+    colunas = {
+        "Produto": df_produtos[COLUNA_NOME].iloc[posicoes].tolist(),
+        "Categoria": df_produtos["Categoria"].iloc[posicoes].astype(str).tolist(),
+        "Quantidade": df_itens["Quantidade"].tolist(),
+        "Unitário (centavos)": para_centavos(df_produtos["Preço Final c/ Impostos (R$)"].iloc[posicoes]).tolist(),
+    }
+    return colunas, df_rejeitados
+
+
+def separar_faltas(colunas, faltas):
+    # Tira dos itens importados os produtos sem estoque (faltas: produto -> disponível)
+    manter = [produto not in faltas for produto in colunas["Produto"]]
+    df_faltas = pd.DataFrame({
+        "Produto": colunas["Produto"],
+        "Quantidade": colunas["Quantidade"],
+        "Motivo": [f"estoque insuficiente ({faltas.get(produto)} disponível)" for produto in colunas["Produto"]],
+    })[[not m for m in manter]]
+    df_faltas.insert(0, "Linha", pd.NA)
+    colunas = {coluna: [valor for valor, m in zip(valores, manter) if m] for coluna, valores in colunas.items()}
+    return colunas, df_faltas
+
+
+def importar_itens(df_planilha, catalogo, estoque, id_sessao, carrinho):
+    # Precifica, reserva o estoque e põe no carrinho de uma vez; devolve
+    # quantos produtos entraram e as linhas recusadas, com o motivo
+    colunas, df_rejeitados = precificar_planilha(df_planilha, catalogo)
+    faltas = estoque.reservar_lote(id_sessao, zip(colunas["Produto"], colunas["Quantidade"]))
+    colunas, df_faltas = separar_faltas(colunas, faltas)
+    carrinho.adicionar_lote(colunas)
+    return len(colunas["Produto"]), pd.concat([df_rejeitados, df_faltas], ignore_index=True)
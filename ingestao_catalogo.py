@@ -0,0 +1,216 @@
+import argparse
+import json
+import os
+import shutil
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from busca import tokenizar
+from catalogo import COLUNA_NOME, compilar_catalogo
+from precificacao import COLUNA_BASE, COLUNA_CATEGORIA, COLUNA_FINAL, COLUNAS_ALIQUOTA, calcular_precos_finais
+
+# Limpeza do catálogo feita uma vez, na entrada do arquivo, e não a cada
+# exibição: valida o layout, normaliza textos, preços e alíquotas, remove
+# nomes duplicados e grava um catálogo limpo com relatório das linhas
+# rejeitadas ou corrigidas. Cada execução guarda uma versão em versoes/.
+# Uso: python ingestao_catalogo.py bruto.csv database/produtos/produtos_completos_formatado.csv
+
+# Versão das regras de limpeza; vai para o resumo de cada ingestão
+VERSAO_INGESTAO = 1
+
+COLUNAS_CATALOGO = [COLUNA_NOME, COLUNA_CATEGORIA, "Descrição", COLUNA_BASE, *COLUNAS_ALIQUOTA, COLUNA_FINAL]
+# Nomes usados nos catálogos antigos (database/produtos/depreciados)
+SINONIMOS_COLUNAS = {"Preço Unitário (R$)": COLUNA_BASE}
+ALIQUOTA_MAXIMA = 100.0
+# Diferença tolerada entre o preço final informado e o recalculado (R$)
+TOLERANCIA_PRECO = 0.01
+# Razão entre os preços que indica um valor com uma casa decimal a mais (x10).
+# A folga cobre catálogos antigos que somavam PIS/COFINS no preço final
+FATOR_INFLACAO = 10
+TOLERANCIA_INFLACAO = 0.15
+
+
+def validar_esquema(df_bruto):
+    df_bruto = df_bruto.rename(columns=lambda col: " ".join(str(col).split()))
+    df_bruto = df_bruto.rename(columns={
+        antigo: novo for antigo, novo in SINONIMOS_COLUNAS.items() if novo not in df_bruto.columns
+    })
+    faltando = [col for col in COLUNAS_CATALOGO if col not in df_bruto.columns and col != COLUNA_FINAL]
+    if faltando:
+        raise ValueError(f"Colunas ausentes no catálogo: {', '.join(faltando)}")
+    ignoradas = [col for col in df_bruto.columns if col not in COLUNAS_CATALOGO]
+    return df_bruto, ignoradas
+
+
+def _texto(serie):
+    # Espaços repetidos e nas pontas removidos; vazio vira <NA>
+    serie = serie.astype("string").str.split().str.join(" ")
+    return serie.mask(serie == "")
+
+
+def _numero(serie):
+    # Aceita números e textos como "R$ 1.234,56" ou "12,5%"
+    if pd.api.types.is_numeric_dtype(serie):
+        return serie.astype("float64")
+    textos = serie.astype("string").str.replace("R$", "", regex=False).str.replace("%", "", regex=False).str.strip()
+    com_virgula = textos.str.contains(",", regex=False, na=False)
+    textos = textos.where(~com_virgula, textos.str.replace(".", "", regex=False).str.replace(",", ".", regex=False))
+    return pd.to_numeric(textos, errors="coerce").astype("float64")
+
+
+def _proximo(razao, fator):
+    return np.abs(razao - fator) <= fator * TOLERANCIA_INFLACAO
+
+
+def normalizar(df_bruto):
+    # Devolve o catálogo normalizado e o relatório (Linha, Produto, Ação, Motivo)
+    linhas = pd.Series(df_bruto.index + 2, index=df_bruto.index)
+    ocorrencias = []
+
+    def anotar(mascara, acao, motivo):
+        if mascara.any():
+            ocorrencias.append(pd.DataFrame({
+                "Linha": linhas[mascara], "Produto": nomes[mascara], "Ação": acao, "Motivo": motivo,
+            }))
+
+    nomes = _texto(df_bruto[COLUNA_NOME])
+    df_limpo = pd.DataFrame({
+        COLUNA_NOME: nomes,
+        COLUNA_CATEGORIA: _texto(df_bruto[COLUNA_CATEGORIA]),
+        "Descrição": _texto(df_bruto["Descrição"]).fillna(""),
+        COLUNA_BASE: _numero(df_bruto[COLUNA_BASE]).round(2),
+    })
+    for col in COLUNAS_ALIQUOTA:
+        df_limpo[col] = _numero(df_bruto[col]).round(2)
+
+    rejeitar = pd.Series(False, index=df_bruto.index)
+    for mascara, motivo in [
+        (nomes.isna(), "nome do produto em branco"),
+        (df_limpo[COLUNA_CATEGORIA].isna(), "categoria em branco"),
+        (~(df_limpo[COLUNA_BASE] > 0), "preço base ausente ou não positivo"),
+        (~df_limpo[COLUNAS_ALIQUOTA].apply(lambda s: s.between(0, ALIQUOTA_MAXIMA)).all(axis=1),
+         f"alíquota ausente ou fora de 0–{ALIQUOTA_MAXIMA:g}%"),
+    ]:
+        mascara = mascara.fillna(True) & ~rejeitar
+        anotar(mascara, "rejeitada", motivo)
+        rejeitar |= mascara
+
+    # O preço final é derivado: base x (1 + alíquotas). Um preço informado que
+    # difere por um fator 10 denuncia o valor com uma casa a mais
+    base = df_limpo[COLUNA_BASE].to_numpy()
+    aliquotas = df_limpo[COLUNAS_ALIQUOTA].to_numpy()
+    calculado = calcular_precos_finais(base, aliquotas)
+    if COLUNA_FINAL in df_bruto.columns:
+        informado = _numero(df_bruto[COLUNA_FINAL]).to_numpy()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            razao = calculado / informado
+        base_inflada = pd.Series(_proximo(razao, FATOR_INFLACAO), index=df_bruto.index) & ~rejeitar
+        final_inflado = pd.Series(_proximo(razao, 1 / FATOR_INFLACAO), index=df_bruto.index) & ~rejeitar
+        divergente = (
+            pd.Series(~(np.abs(calculado - informado) <= TOLERANCIA_PRECO), index=df_bruto.index)
+            & ~rejeitar & ~base_inflada & ~final_inflado
+        )
+        anotar(base_inflada, "corrigida", f"preço base inflado (dividido por {FATOR_INFLACAO})")
+        anotar(final_inflado, "corrigida", "preço final inflado (recalculado)")
+        anotar(divergente, "corrigida", "preço final diferente do calculado (recalculado)")
+        df_limpo.loc[base_inflada, COLUNA_BASE] = (df_limpo.loc[base_inflada, COLUNA_BASE] / FATOR_INFLACAO).round(2)
+        calculado = calcular_precos_finais(df_limpo[COLUNA_BASE].to_numpy(), aliquotas)
+    df_limpo[COLUNA_FINAL] = calculado
+
+    # Nomes iguais a menos de caixa, acentos, pontuação e espaços são ambíguos
+    # no selectbox: fica a primeira ocorrência
+    chaves = nomes.map(lambda nome: " ".join(tokenizar(nome)), na_action="ignore")
+    duplicado = chaves.where(~rejeitar).duplicated(keep="first") & chaves.notna() & ~rejeitar
+    primeira = pd.Series(linhas.groupby(chaves.where(~rejeitar)).transform("first"), index=df_bruto.index)
+    if duplicado.any():
+        ocorrencias.append(pd.DataFrame({
+            "Linha": linhas[duplicado],
+            "Produto": nomes[duplicado],
+            "Ação": "rejeitada",
+            "Motivo": "nome duplicado (mantida a linha " + primeira[duplicado].astype("int64").astype(str) + ")",
+        }))
+    rejeitar |= duplicado
+
+    df_relatorio = pd.concat(ocorrencias, ignore_index=True) if ocorrencias else pd.DataFrame(
+        columns=["Linha", "Produto", "Ação", "Motivo"]
+    )
+    df_relatorio = df_relatorio.sort_values("Linha", kind="stable", ignore_index=True)
+    return df_limpo.loc[~rejeitar, COLUNAS_CATALOGO].reset_index(drop=True), df_relatorio
+
+
+def _gravar_csv(df, caminho):
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    df.to_csv(temporario, index=False)
+    os.replace(temporario, caminho)
+
+
+def _proxima_versao(pasta_versoes, nome):
+    versoes = [
+        int(arquivo[len(nome) + 2:-5])
+        for arquivo in os.listdir(pasta_versoes)
+        if arquivo.startswith(f"{nome}_v") and arquivo.endswith(".json") and arquivo[len(nome) + 2:-5].isdigit()
+    ]
+    return max(versoes, default=0) + 1
+
+
+def ingerir_catalogo(origem, destino, compilar=True):
+    df_bruto = pd.read_csv(origem, dtype=object, keep_default_na=False, na_values=[""])
+    df_bruto, ignoradas = validar_esquema(df_bruto)
+    df_limpo, df_relatorio = normalizar(df_bruto)
+    if df_limpo.empty:
+        raise ValueError("Nenhum produto válido no catálogo; o catálogo atual foi mantido.")
+
+    # Versão numerada guardada ao lado do catálogo, com relatório e resumo
+    nome = os.path.splitext(os.path.basename(destino))[0]
+    pasta_versoes = os.path.join(os.path.dirname(os.path.abspath(destino)), "versoes")
+    os.makedirs(pasta_versoes, exist_ok=True)
+    versao = _proxima_versao(pasta_versoes, nome)
+    prefixo = os.path.join(pasta_versoes, f"{nome}_v{versao:04d}")
+
+    _gravar_csv(df_limpo, f"{prefixo}.csv")
+    _gravar_csv(df_relatorio, f"{prefixo}.relatorio.csv")
+    resumo = {
+        "versao": versao,
+        "versao_ingestao": VERSAO_INGESTAO,
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "origem": os.path.abspath(origem),
+        "linhas_origem": len(df_bruto),
+        "produtos": len(df_limpo),
+        "rejeitadas": int((df_relatorio["Ação"] == "rejeitada").sum()),
+        "corrigidas": int((df_relatorio["Ação"] == "corrigida").sum()),
+        "motivos": df_relatorio["Motivo"].str.replace(r" \(mantida a linha \d+\)", "", regex=True)
+        .value_counts().to_dict(),
+        "colunas_ignoradas": ignoradas,
+    }
+    with open(f"{prefixo}.json", "w", encoding="utf-8") as arquivo:
+        json.dump(resumo, arquivo, ensure_ascii=False, indent=2)
+
+    # O catálogo usado pelo app é trocado de uma vez pela versão nova
+    temporario = f"{destino}.{os.getpid()}.tmp"
+    shutil.copyfile(f"{prefixo}.csv", temporario)
+    os.replace(temporario, destino)
+    if compilar:
+        compilar_catalogo(destino)
+    return resumo
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Valida, limpa e publica um catálogo de produtos.")
+    parser.add_argument("origem", help="CSV bruto do catálogo")
+    parser.add_argument("destino", help="CSV limpo usado pelo app")
+    parser.add_argument("--sem-colunar", action="store_true", help="não compila a cópia colunar")
+    args = parser.parse_args()
+
+    resumo = ingerir_catalogo(args.origem, args.destino, compilar=not args.sem_colunar)
+    print(
+        f"Versão {resumo['versao']}: {resumo['produtos']} produtos de {resumo['linhas_origem']} linhas, "
+        f"{resumo['rejeitadas']} rejeitadas, {resumo['corrigidas']} corrigidas."
+    )
+    for motivo, quantidade in resumo["motivos"].items():
+        print(f"  {quantidade:>6}  {motivo}")
+
+
+if __name__ == "__main__":
+    main()
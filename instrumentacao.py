@@ -0,0 +1,251 @@
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+# Tempo, pico de memória (tracemalloc) e bytes de E/S por etapa de cada rerun.
+# As medições são somadas por processo e por sessão; o total do processo pode
+# ser exportado no formato texto do Prometheus, em arquivo ou numa porta local.
+# O tempo é da etapa; o pico de memória e a E/S são contadores do processo
+# inteiro, então incluem o que outras sessões fizeram no mesmo intervalo.
+# Configuração por variáveis de ambiente:
+#   FORNECEDOR_METRICAS_ARQUIVO  caminho do arquivo .prom regravado a cada rerun
+#   FORNECEDOR_METRICAS_PORTA    porta local que serve /metrics
+#   FORNECEDOR_TRACEMALLOC=1     liga o tracemalloc no processo (tem custo em toda alocação)
+
+ARQUIVO_IO = "/proc/self/io"
+PREFIXO = "fornecedor"
+
+# etapa -> [execuções, segundos, maior tempo, maior pico de memória, bytes lidos, bytes escritos]
+_CAMPOS = [
+    "execucoes", "segundos", "segundos_max",
+    "memoria_pico_processo_bytes", "io_lidos_processo_bytes", "io_escritos_processo_bytes",
+]
+
+
+def ler_bytes_io():
+    # Bytes lidos e escritos pelo processo (rchar/wchar); None fora do Linux
+    try:
+        with open(ARQUIVO_IO, "rb") as arquivo:
+            campos = dict(linha.split(b": ", 1) for linha in arquivo.read().splitlines())
+        return int(campos[b"rchar"]), int(campos[b"wchar"])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def ativar_memoria():
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+class Metricas:
+    def __init__(self):
+        self._trava = threading.Lock()
+        self.zerar()
+
+    def zerar(self):
+        # Descarta tudo o que foi somado (ex.: depois do aquecimento de um teste de carga)
+        with self._trava:
+            self._etapas = {}
+            self.reruns = 0
+            self.segundos_reruns = 0.0
+            self.requisicoes = 0
+            self.segundos_requisicoes = 0.0
+            self._sessoes = set()
+
+    def registrar(self, etapa, segundos, pico_bytes, lidos, escritos):
+        with self._trava:
+            soma = self._etapas.get(etapa)
+            if soma is None:
+                soma = self._etapas[etapa] = [0, 0.0, 0.0, 0, 0, 0]
+            soma[0] += 1
+            soma[1] += segundos
+            soma[2] = max(soma[2], segundos)
+            soma[3] = max(soma[3], pico_bytes)
+            soma[4] += lidos
+            soma[5] += escritos
+
+    def registrar_rerun(self, id_sessao, segundos):
+        with self._trava:
+            self.reruns += 1
+            self.segundos_reruns += segundos
+            if id_sessao is not None:
+                self._sessoes.add(id_sessao)
+
+    def registrar_requisicao(self, segundos):
+        # Requisições da API: contadas à parte dos reruns do Streamlit
+        with self._trava:
+            self.requisicoes += 1
+            self.segundos_requisicoes += segundos
+
+    def tabela(self):
+        with self._trava:
+            linhas = {etapa: list(soma) for etapa, soma in self._etapas.items()}
+        df_metricas = pd.DataFrame.from_dict(linhas, orient="index", columns=_CAMPOS)
+        df_metricas.index.name = "etapa"
+        df_metricas["segundos_medio"] = df_metricas["segundos"] / df_metricas["execucoes"].clip(lower=1)
+        return df_metricas
+
+    def prometheus(self):
+        with self._trava:
+            etapas = {etapa: list(soma) for etapa, soma in self._etapas.items()}
+            reruns, segundos_reruns, sessoes = self.reruns, self.segundos_reruns, len(self._sessoes)
+            requisicoes, segundos_requisicoes = self.requisicoes, self.segundos_requisicoes
+
+        linhas = []
+
+        def metrica(nome, tipo, ajuda, valores):
+            linhas.append(f"# HELP {PREFIXO}_{nome} {ajuda}")
+            linhas.append(f"# TYPE {PREFIXO}_{nome} {tipo}")
+            for rotulo, valor in valores:
+                linhas.append(f"{PREFIXO}_{nome}{rotulo} {valor}")
+
+        def por_etapa(indice):
+            return [(f'{{etapa="{etapa}"}}', soma[indice]) for etapa, soma in sorted(etapas.items())]
+
+        metrica("etapa_execucoes_total", "counter", "Execuções de cada etapa.", por_etapa(0))
+        metrica("etapa_segundos_total", "counter", "Tempo acumulado em cada etapa.", por_etapa(1))
+        metrica("etapa_segundos_max", "gauge", "Maior tempo de uma execução da etapa.", por_etapa(2))
+        metrica(
+            "etapa_memoria_pico_bytes", "gauge",
+            "Maior pico de alocação (tracemalloc) do processo inteiro durante a etapa.", por_etapa(3),
+        )
+        metrica(
+            "etapa_io_lidos_bytes_total", "counter",
+            "Bytes lidos pelo processo inteiro durante a etapa (inclui outras sessões).", por_etapa(4),
+        )
+        metrica(
+            "etapa_io_escritos_bytes_total", "counter",
+            "Bytes escritos pelo processo inteiro durante a etapa (inclui outras sessões).", por_etapa(5),
+        )
+        metrica("reruns_total", "counter", "Reruns concluídos.", [("", reruns)])
+        metrica("reruns_segundos_total", "counter", "Tempo acumulado dos reruns.", [("", segundos_reruns)])
+        metrica("requisicoes_api_total", "counter", "Requisições da API concluídas.", [("", requisicoes)])
+        metrica(
+            "requisicoes_api_segundos_total", "counter", "Tempo acumulado das requisições da API.",
+            [("", segundos_requisicoes)],
+        )
+        metrica("sessoes", "gauge", "Sessões distintas vistas pelo processo.", [("", sessoes)])
+        return "\n".join(linhas) + "\n"
+
+    def gravar_prometheus(self, caminho):
+        # Troca atômica: o coletor nunca lê um arquivo pela metade
+        temporario = f"{caminho}.{os.getpid()}.tmp"
+        with open(temporario, "w", encoding="utf-8") as arquivo:
+            arquivo.write(self.prometheus())
+        os.replace(temporario, caminho)
+
+
+class Medicao:
+    # Medições de um rerun; cada etapa é somada nas métricas de destino ao terminar
+    def __init__(self, *destinos, memoria=False):
+        self.destinos = destinos
+        self.memoria = memoria
+        if memoria:
+            ativar_memoria()
+        self.etapas = []
+        self._inicio = time.perf_counter()
+
+    @contextmanager
+    def etapa(self, nome):
+        medir_memoria = self.memoria and tracemalloc.is_tracing()
+        if medir_memoria:
+            tracemalloc.reset_peak()
+            memoria_inicial = tracemalloc.get_traced_memory()[0]
+        io_inicial = ler_bytes_io()
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            # Também registra etapas interrompidas por st.stop() ou st.rerun()
+            segundos = time.perf_counter() - inicio
+            pico = tracemalloc.get_traced_memory()[1] - memoria_inicial if medir_memoria else 0
+            io_final = ler_bytes_io()
+            lidos, escritos = (0, 0) if io_inicial is None or io_final is None else (
+                io_final[0] - io_inicial[0], io_final[1] - io_inicial[1]
+            )
+            self.etapas.append({
+                "etapa": nome,
+                "segundos": segundos,
+                "memoria_pico_processo_bytes": pico,
+                "io_lidos_processo_bytes": lidos,
+                "io_escritos_processo_bytes": escritos,
+            })
+            for destino in self.destinos:
+                destino.registrar(nome, segundos, pico, lidos, escritos)
+
+    def concluir(self, id_sessao=None):
+        segundos = time.perf_counter() - self._inicio
+        for destino in self.destinos:
+            destino.registrar_rerun(id_sessao, segundos)
+        self._exportar()
+        return segundos
+
+    def concluir_requisicao(self):
+        segundos = time.perf_counter() - self._inicio
+        for destino in self.destinos:
+            destino.registrar_requisicao(segundos)
+        self._exportar()
+        return segundos
+
+    def _exportar(self):
+        caminho = os.environ.get("FORNECEDOR_METRICAS_ARQUIVO")
+        if caminho:
+            obter_metricas().gravar_prometheus(caminho)
+
+    def tabela(self):
+        colunas = [
+            "etapa", "segundos", "memoria_pico_processo_bytes", "io_lidos_processo_bytes", "io_escritos_processo_bytes",
+        ]
+        return pd.DataFrame(self.etapas, columns=colunas).set_index("etapa")
+
+
+# Métricas do processo, compartilhadas por todas as sessões
+_metricas = Metricas()
+_servidor = None
+_trava_servidor = threading.Lock()
+
+
+def obter_metricas():
+    return _metricas
+
+
+def memoria_por_padrao():
+    return os.environ.get("FORNECEDOR_TRACEMALLOC") == "1"
+
+
+class _TratadorMetricas(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") != "/metrics":
+            self.send_error(404)
+            return
+        corpo = obter_metricas().prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, formato, *args):
+        pass
+
+
+def iniciar_servidor(porta=None):
+    # Sobe uma vez por processo o endpoint /metrics, se houver porta configurada
+    global _servidor
+    porta = porta or os.environ.get("FORNECEDOR_METRICAS_PORTA")
+    if not porta:
+        return None
+    with _trava_servidor:
+        if _servidor is None:
+            try:
+                _servidor = ThreadingHTTPServer(("127.0.0.1", int(porta)), _TratadorMetricas)
+            except OSError:
+                # Porta ocupada (ex.: outro processo do app já exporta): segue sem endpoint
+                return None
+            threading.Thread(target=_servidor.serve_forever, daemon=True).start()
+        return _servidor
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+# Valores monetários circulam como centavos inteiros (int64); a conversão para
+# texto no padrão brasileiro (1.234,56) acontece só na hora de exibir.
+
+_SEPARADOR_MILHAR = r"\B(?=(\d{3})+(?!\d))"
+
+
+def para_centavos(valores):
+    centavos = np.rint(np.asarray(valores, dtype="float64") * 100)
+    if np.ndim(centavos) == 0:
+        return int(centavos)
+    return centavos.astype("int64")
+
+
+def para_reais(centavos):
+    reais = np.asarray(centavos, dtype="int64") / 100
+    if np.ndim(reais) == 0:
+        return float(reais)
+    return reais
+
+
+def ler_brl(textos):
+    # "R$ 1.234,56" -> 123456; textos inválidos viram <NA>. O "." só é
+    # separador de milhar quando há vírgula decimal: "1234.56" continua 123456
+    textos = pd.Series(textos, dtype="string")
+    limpos = textos.str.replace("R$", "", regex=False).str.strip()
+    com_virgula = limpos.str.contains(",", regex=False).fillna(False)
+    limpos = limpos.where(
+        ~com_virgula,
+        limpos.str.replace(".", "", regex=False).str.replace(",", ".", regex=False),
+    )
+    reais = pd.to_numeric(limpos, errors="coerce")
+    return (reais * 100).round().astype("Int64")
+
+
+def formatar_brl(centavos, omitir_centavos_zerados=False):
+    centavos = pd.Series(centavos)
+    nulos = centavos.isna()
+    inteiros = centavos.fillna(0).astype("int64")
+
+    sinal = pd.Series(np.where(inteiros < 0, "-", ""), index=inteiros.index)
+    absolutos = inteiros.abs()
+    reais = (absolutos // 100).astype(str).str.replace(_SEPARADOR_MILHAR, ".", regex=True)
+    fracao = (absolutos % 100).astype(str).str.zfill(2)
+
+    texto = sinal + reais + "," + fracao
+    if omitir_centavos_zerados:
+        texto = texto.where(fracao != "00", sinal + reais)
+    return texto.where(~nulos, "")
+
+
+def formatar_valor(valor):
+    # Versão escalar, para totais e valores avulsos em reais; valor ausente vira
+    # texto vazio, como em formatar_brl
+    if pd.isna(valor):
+        return ""
+    centavos = para_centavos(valor)
+    sinal = "-" if centavos < 0 else ""
+    reais, fracao = divmod(abs(centavos), 100)
+    return f"{sinal}{reais:,}".replace(",", ".") + f",{fracao:02d}"
@@ -0,0 +1,237 @@
+import streamlit as st
+
+from busca import obter_indice
+from estoque import EstoqueInsuficiente
+from exportacao import exportar_dataframe, formatos_disponiveis, rotulo, tipo_mime
+from importacao import importar_itens, ler_planilha
+from moeda import formatar_valor, para_centavos, para_reais
+from pedido import QUANTIDADE_MAXIMA, montar_pedido, nome_arquivo_pedido
+from servicos import (
+    concluir_medicao, iniciar_medicao, obter_carrinho, obter_catalogo, obter_estoque, obter_fornecedor, obter_id_sessao,
+    obter_recomendacoes, obter_registro,
+)
+
+fornecedor = obter_fornecedor()
+
+st.title(f"🛒 Sistema de Compras - {fornecedor.nome}")
+
+
+# Carrinho e reservas de estoque desta sessão, os mesmos em todas as páginas
+carrinho = obter_carrinho()
+id_sessao = obter_id_sessao()
+
+# Medição das etapas deste rerun (painel com ?debug=1)
+medicao = iniciar_medicao()
+
+# Carregamento dos dados com tratamento
+with medicao.etapa("catalogo"):
+    try:
+        catalogo = obter_catalogo()
+        assert len(catalogo) > 0, "Arquivo de produtos está vazio!"
+        estoque = obter_estoque()
+    except Exception as e:
+        st.error(f"❌ Erro ao carregar produtos: {e}")
+        st.stop()
+
+# Seleção do produto
+
+# Só os resultados da página atual vão para o navegador, não o catálogo inteiro
+resultados_por_pagina = 50
+SUGESTOES_EXIBIDAS = 5
+
+def reiniciar_pagina_busca():
+    st.session_state.pagina_busca = 1
+
+with medicao.etapa("busca"):
+    indice_busca = obter_indice(catalogo)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        consulta = st.text_input("🔎 Buscar produto", placeholder="Nome, categoria ou descrição", on_change=reiniciar_pagina_busca)
+        pagina = st.session_state.get("pagina_busca", 1)
+        resultado = indice_busca.buscar(consulta, pagina - 1, resultados_por_pagina)
+        if not resultado.nomes:
+            if consulta:
+                st.warning("Nenhum produto encontrado para essa busca.")
+            resultado = indice_busca.buscar("", 0, resultados_por_pagina)
+
+        produto_selecionado = st.selectbox(f"Selecione um produto ({resultado.total} encontrados)", resultado.nomes)
+        produto_info = catalogo.produto(produto_selecionado)
+
+    with col2:
+        quantidade = st.number_input("Quantidade", min_value=1, max_value=QUANTIDADE_MAXIMA, step=1)
+        if resultado.paginas > 1:
+            st.number_input(f"Página de resultados (de {resultado.paginas})", min_value=1, max_value=resultado.paginas, step=1, key="pagina_busca")
+
+
+# Exibir detalhes
+with medicao.etapa("produto"):
+    col_info, col_sugestoes = st.columns([2, 1])
+    with col_info:
+        st.subheader("📦 Informações do Produto")
+
+
+        # Exibir informações do produto selecionado
+        st.write(f"**Categoria** {produto_info['Categoria']}")
+        st.write(f"**Descrição:** {produto_info['Descrição']}")
+        st.write(f"**Preço Base (R$):** {produto_info['Preço Base (R$)']}") 
+        st.write(f"**Impostos (R$):** {produto_info['Imposto de Importação (%)']}")
+        st.write(f"**ICMS (%):** {produto_info['ICMS (%)']}")
+        st.write(f"**IPI (%):** {produto_info['IPI (%)']}")
+        disponivel = estoque.disponivel(produto_selecionado)
+        if disponivel is not None:
+            st.write(f"**Estoque Disponível:** {disponivel}")
+
+        ## Esse é o cálculo do preço final
+        st.markdown(f"### :orange[**Preço Final (R$):** {formatar_valor(produto_info['Preço Final c/ Impostos (R$)'])}] ")
+
+# Sugestões prontas por produto: o rerun só consulta um dicionário
+with medicao.etapa("recomendacoes"):
+    with col_sugestoes:
+        st.subheader("🤝 Comprados Juntos")
+        try:
+            # Produtos que saíram do catálogo não são sugeridos
+            sugestoes = [
+                (outro, pedidos) for outro, pedidos in obter_recomendacoes().sugestoes(produto_selecionado)
+                if outro in catalogo
+            ][:SUGESTOES_EXIBIDAS]
+        except Exception as e:
+            sugestoes = []
+            st.caption(f"Sugestões indisponíveis: {e}")
+        if sugestoes:
+            for outro, pedidos in sugestoes:
+                preco = formatar_valor(catalogo.produto(outro)["Preço Final c/ Impostos (R$)"])
+                st.write(f"**{outro}**  \nR$ {preco} · em {pedidos} pedido(s) com este produto")
+        else:
+            st.caption("Ainda não há pedidos com este produto junto de outros.")
+
+
+# Adicionar ao carrinho
+if st.button("➕ Adicionar ao Carrinho"):
+    with medicao.etapa("adicionar"):
+        try:
+            # Valores calculados em centavos para não acumular erro de ponto flutuante
+            unitario_centavos = para_centavos(produto_info["Preço Final c/ Impostos (R$)"])
+            # A reserva vem antes: se não houver estoque, o item não entra no carrinho
+            estoque.reservar(id_sessao, produto_selecionado, quantidade)
+            carrinho.adicionar(produto_selecionado, produto_info["Categoria"], quantidade, unitario_centavos)
+            st.success(f"Produto adicionado ao carrinho ({carrinho.quantidade(produto_selecionado)} no total).")
+        except EstoqueInsuficiente as e:
+            st.error(f"❌ Estoque insuficiente: apenas {e.disponivel} unidade(s) disponível(is).")
+        except Exception as e:
+            st.error(f"Erro ao adicionar item ao carrinho: {e}")
+
+# Importação de uma lista de compras inteira em uma única execução
+with st.expander("📄 Importar lista de compras (CSV ou Excel)"):
+    st.caption("A planilha precisa das colunas **Produto** e **Quantidade**.")
+    planilha = st.file_uploader("Arquivo da lista", type=["csv", "xlsx"])
+    if planilha is not None and st.button("📥 Adicionar itens da planilha"):
+        with medicao.etapa("importacao"):
+            try:
+                df_planilha = ler_planilha(planilha.getvalue(), planilha.name)
+                adicionados, df_rejeitados = importar_itens(df_planilha, catalogo, estoque, id_sessao, carrinho)
+                st.success(f"{adicionados} produtos adicionados ao carrinho.")
+                if not df_rejeitados.empty:
+                    st.warning(f"⚠️ {len(df_rejeitados)} linhas da planilha não foram importadas:")
+                    st.dataframe(df_rejeitados, hide_index=True)
+            except Exception as e:
+                st.error(f"Erro ao importar a planilha: {e}")
+
+# Mostrar carrinho com opção de remover
+# Aviso da remoção feita na execução anterior
+if "aviso_carrinho" in st.session_state:
+    st.warning(st.session_state.pop("aviso_carrinho"))
+
+if len(carrinho) > 0:
+    st.subheader("🛒 Carrinho de Compras")
+
+    with medicao.etapa("carrinho"):
+        # Tabela formatada guardada no carrinho; só é refeita quando ele muda
+        df_exibicao = carrinho.exibicao().copy()
+
+        # Adicionar coluna de remoção
+        df_exibicao["Remover"] = False
+
+        # Editor interativo com checkbox para exclusão; a chave muda com a versão
+        # do carrinho para que marcações antigas não se apliquem a outras linhas
+        editado = st.data_editor(
+            df_exibicao,
+            column_config={
+                "Remover": st.column_config.CheckboxColumn("❌ Excluir Produto")
+            },
+            disabled=["Produto", "Categoria", "Quantidade", "Valor Unitário (R$)", "Valor Total (R$)"],
+            hide_index=True,
+            use_container_width=True,
+            key=f"editor_remocao_{carrinho.versao}"
+        )
+
+        # Verifica itens removidos
+        removidos = editado.loc[editado["Remover"].to_numpy(dtype=bool), "Produto"].tolist()
+        if removidos:
+            for produto in removidos:
+                carrinho.remover(produto)
+            estoque.liberar(id_sessao, removidos)
+            st.session_state.aviso_carrinho = f"🗑️ Os seguintes produtos foram removidos do carrinho: {', '.join(removidos)}"
+            st.rerun()
+
+    # Total mantido pelo próprio carrinho
+    if len(carrinho) > 0:
+        st.markdown(f"# :green[**💰 Total da Compra: R$ {formatar_valor(para_reais(carrinho.total_centavos))}**]")
+
+        # Formulário do comprador
+        st.subheader("👤 Finalizar Compra")
+        nome = st.text_input("Nome do Comprador")
+        empresa = st.text_input("Empresa / Equipe")
+        email = st.text_input("Email")
+        encargo_percentual = fornecedor.encargo_percentual
+        
+        if st.button("💾 Finalizar Pedido"):
+            if not nome or not empresa or not email:
+                st.warning("⚠️ Preencha todos os campos antes de finalizar.")
+            else:
+                with medicao.etapa("checkout"):
+                    try:
+                        colunas_carrinho = carrinho.colunas()
+                        df_vendas = montar_pedido(colunas_carrinho, nome, empresa, email, encargo_percentual)
+
+                        # Baixa do estoque primeiro; se a gravação da venda falhar, ela é desfeita
+                        itens = list(zip(colunas_carrinho["Produto"], colunas_carrinho["Quantidade"]))
+                        estoque.confirmar(id_sessao, itens)
+                        try:
+                            id_pedido = obter_registro().registrar_pedido(df_vendas)
+                        except Exception:
+                            estoque.devolver(itens)
+                            raise
+
+                        st.success(f"✅ Pedido nº {id_pedido} finalizado com sucesso!")
+                        if fornecedor.email:
+                            st.header("Envie o csv nesse email abaixo: ")
+                            st.link_button(fornecedor.email, f"mailto:{fornecedor.email}")
+
+                        # O arquivo do pedido é gerado em memória só quando o botão é clicado;
+                        # on_click="ignore" mantém a tela para baixar em outro formato
+                        for col, formato in zip(st.columns(len(formatos_disponiveis())), formatos_disponiveis()):
+                            col.download_button(
+                                label=f"⬇️ Baixar Pedido em {rotulo(formato)}",
+                                data=lambda formato=formato: exportar_dataframe(df_vendas, formato),
+                                file_name=nome_arquivo_pedido(nome, formato),
+                                mime=tipo_mime(formato),
+                                on_click="ignore",
+                            )
+
+                        carrinho.limpar()
+
+                    except EstoqueInsuficiente as e:
+                        st.error(f"❌ {e} Remova ou ajuste o item no carrinho.")
+                    except Exception as e:
+                        st.error(f"Erro ao registrar vendas: {e}")
+
+
+
+    else:
+        st.info("Seu carrinho está vazio.")
+else:
+    st.info("Seu carrinho está vazio.")
+
+
+concluir_medicao(medicao, id_sessao)
@@ -0,0 +1,154 @@
+import os
+import streamlit as st
+from datetime import date, timedelta
+from itertools import chain
+
+import pandas as pd
+
+import agregados
+from exportacao import exportar, formatos_disponiveis, lotes_dataframe, rotulo, tipo_mime
+from moeda import formatar_valor
+from servicos import (
+    concluir_medicao, descartes_vendas_antigas, iniciar_medicao, ler_vendas_antigas, listar_vendas_antigas,
+    obter_fornecedor, obter_registro, obter_vendas_antigas,
+)
+
+st.title(f"📊 Dashboard de Vendas - {obter_fornecedor().nome}")
+
+medicao = iniciar_medicao()
+
+# Vendas antigas resumidas uma vez por processo; o registro é o mesmo da página de compras
+with medicao.etapa("dashboard_dados"):
+    totais_antigos, dimensoes_antigas, particoes_antigas = obter_vendas_antigas()
+    registro = obter_registro()
+
+# Arquivos antigos que não puderam ser lidos e linhas com valores que não fecham ficam fora dos totais
+ilegiveis, descartadas = descartes_vendas_antigas()
+if ilegiveis:
+    st.warning(
+        f"⚠️ {len(ilegiveis)} arquivo(s) de vendas antigas ignorado(s) por estarem malformados: "
+        f"{', '.join(sorted(os.path.basename(caminho) for caminho in ilegiveis))}"
+    )
+if descartadas:
+    st.warning(
+        f"⚠️ {descartadas} venda(s) antiga(s) fora dos totais: Valor Total diferente de "
+        "Quantidade × Valor Unitário ou acima do limite."
+    )
+
+# Janela de análise: só as partições dos dias escolhidos são lidas
+PERIODOS = {
+    "Últimos 7 dias": 7,
+    "Últimos 30 dias": 30,
+    "Últimos 90 dias": 90,
+    "Últimos 12 meses": 365,
+    "Todo o período": None,
+}
+GRANULARIDADES = {"Dia": "dia", "Semana": "semana", "Mês": "mes"}
+VENDAS_POR_PAGINA = 50
+
+col_periodo, col_granularidade = st.columns(2)
+with col_periodo:
+    periodo = st.selectbox("📆 Período", list(PERIODOS), index=1)
+with col_granularidade:
+    granularidade = st.radio("Agrupar receita por", list(GRANULARIDADES), horizontal=True)
+
+dias = PERIODOS[periodo]
+desde = None if dias is None else (date.today() - timedelta(days=dias - 1)).isoformat()
+
+# Vendas do registro (agregados materializados) somadas às vendas antigas
+with medicao.etapa("dashboard_totais"):
+    por_dia = agregados.combinar_dimensao(
+        registro.serie(desde), agregados.recortar_serie(dimensoes_antigas["dia"], desde)
+    )
+    if desde is None:
+        totais = agregados.combinar_totais(registro.totais(), totais_antigos)
+    else:
+        totais = {metrica: por_dia[metrica].sum() for metrica in agregados.METRICAS + ["lucro_liquido"]}
+
+
+def por_periodo(dimensao):
+    return agregados.combinar_dimensao(
+        registro.periodo(dimensao, desde), agregados.recortar_particao(particoes_antigas[dimensao], desde)
+    )
+
+
+if totais["itens"] > 0:
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("🛍️ Total em Vendas (R$)", formatar_valor(totais["total_vendas"]))
+    col2.metric("📉 Total de Encargos (R$)", formatar_valor(totais["total_encargos"]))
+    col3.metric("📦 Quantidade Total Vendida", int(totais["quantidade"]))
+    col4.metric("💰 Lucro Líquido Estimado (R$)", formatar_valor(totais["lucro_liquido"]))
+
+    st.markdown(f"### 📅 Receita por {granularidade}")
+    serie = agregados.agrupar_serie(por_dia, GRANULARIDADES[granularidade])
+    st.line_chart(serie["total_vendas"].rename(agregados.ROTULOS["total_vendas"]))
+
+    por_categoria = por_periodo("categoria")
+    st.markdown("### 🗂️ Vendas por Categoria")
+    mix = por_categoria[["total_vendas"]].sort_values("total_vendas", ascending=False)
+    mix["Participação (%)"] = (mix["total_vendas"] / mix["total_vendas"].sum() * 100).round(1)
+    col_grafico, col_tabela = st.columns([2, 1])
+    col_grafico.bar_chart(mix["total_vendas"].rename(agregados.ROTULOS["total_vendas"]))
+    col_tabela.dataframe(mix.rename(columns=agregados.ROTULOS))
+
+    col_produtos, col_empresas = st.columns(2)
+    with col_produtos:
+        st.markdown("### 🏆 Produtos Mais Vendidos")
+        st.dataframe(
+            por_periodo("produto").sort_values("total_vendas", ascending=False).head(20).rename(columns=agregados.ROTULOS)
+        )
+    por_empresa = por_periodo("empresa")
+    with col_empresas:
+        st.markdown("### 🏢 Empresas que Mais Compram")
+        st.dataframe(
+            por_empresa.sort_values("total_vendas", ascending=False).head(20).rename(columns=agregados.ROTULOS)
+        )
+
+    # Só a página pedida sai do banco e vai para o navegador. As vendas do
+    # registro vêm primeiro e as dos arquivos antigos (anteriores a ele) depois
+    st.markdown("### 📋 Vendas do Período")
+    total_registro = registro.contar_vendas(desde)
+    df_antigas, dias_antigos = listar_vendas_antigas()
+    total_antigas = len(df_antigas) if desde is None else int((dias_antigos >= desde).sum())
+    total_vendas = total_registro + total_antigas
+    paginas = max(1, -(-total_vendas // VENDAS_POR_PAGINA))
+    pagina = 1
+    if paginas > 1:
+        pagina = st.number_input(f"Página (de {paginas})", min_value=1, max_value=paginas, step=1)
+    st.caption(f"{total_registro} vendas no registro e {total_antigas} em arquivos antigos para o período.")
+
+    inicio = (pagina - 1) * VENDAS_POR_PAGINA
+    partes = []
+    if inicio < total_registro:
+        partes.append(registro.pagina_vendas(pagina - 1, VENDAS_POR_PAGINA, desde))
+    faltando = VENDAS_POR_PAGINA - sum(len(parte) for parte in partes)
+    inicio_antigas = max(0, inicio - total_registro)
+    if faltando > 0 and inicio_antigas < total_antigas:
+        partes.append(df_antigas.iloc[inicio_antigas:min(inicio_antigas + faltando, total_antigas)])
+    if partes:
+        st.dataframe(pd.concat(partes, ignore_index=True) if len(partes) > 1 else partes[0], hide_index=True)
+
+    # Relatório gerado em lotes, direto do registro e dos CSVs antigos, só no clique
+    with st.expander("⬇️ Exportar vendas do período"):
+        col_empresas_filtro, col_categorias_filtro, col_formato = st.columns([2, 2, 1])
+        empresas = col_empresas_filtro.multiselect("Empresas", sorted(por_empresa.index), placeholder="Todas")
+        categorias = col_categorias_filtro.multiselect("Categorias", sorted(por_categoria.index), placeholder="Todas")
+        formato = col_formato.radio("Formato", formatos_disponiveis(), format_func=rotulo)
+
+        def gerar_relatorio():
+            return exportar(chain(
+                registro.iterar_vendas(desde, None, empresas, categorias),
+                lotes_dataframe(ler_vendas_antigas(), desde, None, empresas, categorias),
+            ), formato)
+
+        st.download_button(
+            label=f"⬇️ Baixar relatório em {rotulo(formato)}",
+            data=gerar_relatorio,
+            file_name=f"vendas_{desde or 'inicio'}_{date.today().isoformat()}.{formato}",
+            mime=tipo_mime(formato),
+            on_click="ignore",
+        )
+else:
+    st.info("Nenhuma venda registrada no período.")
+
+concluir_medicao(medicao)
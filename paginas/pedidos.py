@@ -0,0 +1,65 @@
+import streamlit as st
+
+from importacao import importar_itens
+from servicos import (
+    concluir_medicao, iniciar_medicao, obter_carrinho, obter_catalogo, obter_estoque, obter_id_sessao, obter_registro,
+)
+
+st.title("📜 Meus Pedidos")
+
+carrinho = obter_carrinho()
+id_sessao = obter_id_sessao()
+
+medicao = iniciar_medicao()
+
+PEDIDOS_POR_CONSULTA = 50
+
+st.caption("Pedidos finalizados no app, encontrados pelo email ou pela empresa informados na compra.")
+col_email, col_empresa = st.columns(2)
+email = col_email.text_input("Email", key="historico_email")
+empresa = col_empresa.text_input("Empresa / Equipe", key="historico_empresa")
+
+if not email.strip() and not empresa.strip():
+    st.info("Informe o email ou a empresa para ver os pedidos.")
+else:
+    # Consulta pelos índices de email/empresa do registro: o custo depende
+    # dos pedidos do comprador, não do total de pedidos gravados
+    with medicao.etapa("historico"):
+        registro = obter_registro()
+        df_pedidos = registro.pedidos_do_comprador(email, empresa, PEDIDOS_POR_CONSULTA)
+
+    if df_pedidos.empty:
+        st.warning("Nenhum pedido encontrado para esse comprador.")
+    else:
+        st.dataframe(df_pedidos, hide_index=True)
+        if len(df_pedidos) == PEDIDOS_POR_CONSULTA:
+            st.caption(f"Mostrando os {PEDIDOS_POR_CONSULTA} pedidos mais recentes.")
+
+        id_pedido = st.selectbox(
+            "Pedido",
+            df_pedidos["ID do Pedido"].tolist(),
+            format_func=lambda id_pedido: f"Pedido nº {id_pedido}",
+        )
+        df_itens = registro.itens_pedido(id_pedido)
+        st.dataframe(
+            df_itens[["Produto", "Categoria", "Quantidade", "Valor Unitário (R$)", "Valor Total (R$)"]],
+            hide_index=True,
+        )
+
+        # Os itens voltam ao carrinho pelo mesmo caminho da importação de planilha:
+        # preço atual do catálogo e reserva de estoque
+        if st.button("🔁 Repetir pedido"):
+            with medicao.etapa("repetir_pedido"):
+                try:
+                    adicionados, df_rejeitados = importar_itens(
+                        df_itens[["Produto", "Quantidade"]], obter_catalogo(), obter_estoque(), id_sessao, carrinho
+                    )
+                    st.success(f"{adicionados} produtos adicionados ao carrinho, com os preços atuais.")
+                    if not df_rejeitados.empty:
+                        st.warning(f"⚠️ {len(df_rejeitados)} itens do pedido não foram adicionados:")
+                        st.dataframe(df_rejeitados.drop(columns="Linha"), hide_index=True)
+                    st.page_link("paginas/compras.py", label="Ir para o carrinho", icon="🛒")
+                except Exception as e:
+                    st.error(f"Erro ao repetir o pedido: {e}")
+
+concluir_medicao(medicao, id_sessao)
@@ -0,0 +1,56 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from moeda import para_reais
+from registro_vendas import COLUNAS_VENDA
+
+ENCARGO_PERCENTUAL = 0.20
+# Quantidade máxima de um produto num pedido (tela, planilha e API)
+QUANTIDADE_MAXIMA = 1_000_000
+# Os valores em reais são gravados como float64 (registro e arquivos): acima
+# de 2**53 centavos o centavo deixa de ser exato
+VALOR_MAXIMO_CENTAVOS = 2**53
+
+
+def verificar_totais(produtos, quantidades, unitarios):
+    # Recusa as linhas cujo total passaria do limite antes de multiplicar em
+    # int64, que estoura sem aviso
+    limites = VALOR_MAXIMO_CENTAVOS // np.maximum(np.abs(unitarios), 1)
+    excedidos = np.abs(quantidades) > limites
+    if excedidos.any():
+        nomes = [produto for produto, excedido in zip(produtos, excedidos) if excedido]
+        raise ValueError(f"Valor total acima do limite para: {', '.join(map(str, nomes))}. Reduza a quantidade.")
+
+
+def montar_pedido(colunas_carrinho, nome, empresa, email, encargo_percentual=ENCARGO_PERCENTUAL, data=None):
+    # Todas as linhas do pedido calculadas de uma vez, a partir das colunas do carrinho
+    try:
+        quantidades = np.asarray(colunas_carrinho["Quantidade"], dtype="int64")
+        unitarios = np.asarray(colunas_carrinho["Unitário (centavos)"], dtype="int64")
+    except OverflowError:
+        raise ValueError("Quantidade ou valor unitário acima do limite.")
+    verificar_totais(colunas_carrinho["Produto"], quantidades, unitarios)
+    totais = unitarios * quantidades
+    encargos = np.rint(totais * encargo_percentual).astype("int64")
+
+    linhas = len(quantidades)
+    data = data or datetime.today().strftime('%Y-%m-%d')
+    return pd.DataFrame({
+        "Data da Compra": np.repeat(data, linhas),
+        "Nome do Comprador": np.repeat(nome, linhas),
+        "Empresa": np.repeat(empresa, linhas),
+        "Email": np.repeat(email, linhas),
+        "Produto": colunas_carrinho["Produto"],
+        "Categoria": colunas_carrinho["Categoria"],
+        "Quantidade": quantidades,
+        "Valor Unitário (R$)": para_reais(unitarios),
+        "Valor Total (R$)": para_reais(totais),
+        "Encargo (%)": np.full(linhas, encargo_percentual * 100),
+        "Encargo (R$)": para_reais(encargos),
+    }, columns=COLUNAS_VENDA)
+
+
+def nome_arquivo_pedido(nome, extensao="csv"):
+    return f"venda_{nome.replace(' ', '_').upper()}_{datetime.now().strftime('%Y%m%d%H%M%S')}.{extensao}"
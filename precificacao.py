@@ -0,0 +1,117 @@
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from catalogo import compilar_catalogo, ler_catalogo
+
+COLUNA_BASE = "Preço Base (R$)"
+COLUNA_FINAL = "Preço Final c/ Impostos (R$)"
+COLUNA_CATEGORIA = "Categoria"
+COLUNAS_ALIQUOTA = ["Imposto de Importação (%)", "ICMS (%)", "IPI (%)"]
+
+
+def calcular_precos_finais(precos_base, aliquotas):
+    # Preço final = base * (1 + soma das alíquotas / 100), em uma passada NumPy
+    precos_base = np.asarray(precos_base, dtype="float64")
+    aliquotas = np.asarray(aliquotas, dtype="float64")
+    return np.round(precos_base * (1 + aliquotas.sum(axis=1) / 100), 2)
+
+
+class TabelaPrecos:
+    def __init__(self, df_produtos, sobrescritas=None):
+        self.precos_base = pd.to_numeric(df_produtos[COLUNA_BASE], errors="coerce").to_numpy(dtype="float64")
+        # Alíquotas originais do catálogo, uma coluna por imposto
+        self.aliquotas_catalogo = np.column_stack([
+            pd.to_numeric(df_produtos[col], errors="coerce").to_numpy(dtype="float64") for col in COLUNAS_ALIQUOTA
+        ])
+
+        categorias = pd.Categorical(df_produtos[COLUNA_CATEGORIA].astype(str))
+        self.categorias = list(categorias.categories)
+        codigos = categorias.codes
+        # Posições das linhas de cada categoria, para recalcular só o que muda
+        ordem = np.argsort(codigos, kind="stable")
+        limites = np.searchsorted(codigos[ordem], np.arange(len(self.categorias) + 1))
+        self._linhas_categoria = {
+            categoria: ordem[limites[i]:limites[i + 1]] for i, categoria in enumerate(self.categorias)
+        }
+
+        self.sobrescritas = {}
+        self.aliquotas = self.aliquotas_catalogo.copy()
+        self.precos_finais = calcular_precos_finais(self.precos_base, self.aliquotas)
+        for categoria, aliquotas in (sobrescritas or {}).items():
+            for coluna, valor in aliquotas.items():
+                self.definir_aliquota(categoria, coluna, valor)
+
+    def _recalcular(self, linhas):
+        self.precos_finais[linhas] = calcular_precos_finais(self.precos_base[linhas], self.aliquotas[linhas])
+
+    def _linhas(self, categoria):
+        if categoria not in self._linhas_categoria:
+            raise KeyError(f"Categoria desconhecida: {categoria}")
+        return self._linhas_categoria[categoria]
+
+    def definir_aliquota(self, categoria, coluna, valor):
+        indice_coluna = COLUNAS_ALIQUOTA.index(coluna)
+        linhas = self._linhas(categoria)
+        self.sobrescritas.setdefault(categoria, {})[coluna] = float(valor)
+        self.aliquotas[linhas, indice_coluna] = float(valor)
+        self._recalcular(linhas)
+        return len(linhas)
+
+    def remover_sobrescrita(self, categoria, coluna=None):
+        linhas = self._linhas(categoria)
+        colunas = [coluna] if coluna else list(self.sobrescritas.get(categoria, {}))
+        for col in colunas:
+            indice_coluna = COLUNAS_ALIQUOTA.index(col)
+            self.aliquotas[linhas, indice_coluna] = self.aliquotas_catalogo[linhas, indice_coluna]
+            self.sobrescritas.get(categoria, {}).pop(col, None)
+        if not self.sobrescritas.get(categoria):
+            self.sobrescritas.pop(categoria, None)
+        self._recalcular(linhas)
+        return len(linhas)
+
+    def aplicar(self, df_produtos):
+        df_precificado = df_produtos.copy()
+        for indice_coluna, col in enumerate(COLUNAS_ALIQUOTA):
+            df_precificado[col] = self.aliquotas[:, indice_coluna]
+        df_precificado[COLUNA_FINAL] = self.precos_finais
+        return df_precificado
+
+
+def ler_sobrescritas(caminho):
+    # JSON no formato {"Categoria": {"ICMS (%)": 18.0, ...}, ...}
+    with open(caminho, encoding="utf-8") as arquivo:
+        return json.load(arquivo)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recalcula os preços finais do catálogo a partir das alíquotas.")
+    parser.add_argument("catalogo", help="CSV do catálogo de produtos")
+    parser.add_argument("--aliquotas", help="JSON com alíquotas por categoria")
+    parser.add_argument("--saida", help="CSV de saída (padrão: sobrescreve o catálogo)")
+    parser.add_argument("--sem-colunar", action="store_true", help="não compila a cópia colunar")
+    args = parser.parse_args()
+
+    df_produtos = ler_catalogo(args.catalogo)
+    sobrescritas = ler_sobrescritas(args.aliquotas) if args.aliquotas else None
+    tabela = TabelaPrecos(df_produtos, sobrescritas)
+    df_precificado = tabela.aplicar(df_produtos)
+
+    alterados = int(np.count_nonzero(
+        ~np.isclose(df_precificado[COLUNA_FINAL].to_numpy(), df_produtos[COLUNA_FINAL].to_numpy(dtype="float64"))
+    ))
+    # O app pode estar lendo o catálogo: o arquivo é trocado de uma vez, como na ingestão
+    destino = args.saida or args.catalogo
+    temporario = f"{destino}.{os.getpid()}.tmp"
+    df_precificado.to_csv(temporario, index=False)
+    os.replace(temporario, destino)
+    if not args.sem_colunar:
+        compilar_catalogo(destino)
+    print(f"{len(df_precificado)} produtos precificados, {alterados} preços alterados.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+import os
+import threading
+from collections import Counter
+
+import pandas as pd
+
+# "Comprados juntos": matriz esparsa de coocorrência de produtos (em quantos
+# pedidos os dois apareceram), mantida no registro na mesma transação que grava
+# o pedido. As sugestões de cada produto (top-k) ficam prontas em memória e só
+# são refeitas para os produtos dos pedidos novos.
+
+TOP_K = 10
+# Vendas antigas não têm ID do pedido: um pedido é o mesmo comprador na mesma data
+CHAVE_PEDIDO_ANTIGO = ["Data da Compra", "Nome do Comprador", "Empresa", "Email"]
+# As vendas antigas só mudam com importações e compactações: as sugestões
+# aceitam a última listagem da pasta feita há menos que isso (segundos)
+INTERVALO_VENDAS_ANTIGAS = 60
+# Produtos por consulta IN (...), abaixo do limite de parâmetros do SQLite
+LOTE_CONSULTA = 500
+
+COLUNAS_PARES = ["produto", "outro", "pedidos"]
+
+_UPSERT = """
+    INSERT INTO coocorrencias (produto, outro, pedidos) VALUES (?, ?, ?)
+    ON CONFLICT(produto, outro) DO UPDATE SET pedidos = pedidos + excluded.pedidos
+"""
+
+
+def criar_tabelas(conexao):
+    # Cada par é gravado nos dois sentidos: a linha de um produto sai da chave primária
+    conexao.execute(
+        "CREATE TABLE IF NOT EXISTS coocorrencias (produto TEXT NOT NULL, outro TEXT NOT NULL, "
+        "pedidos INTEGER NOT NULL, PRIMARY KEY (produto, outro)) WITHOUT ROWID"
+    )
+
+
+def _pares(produtos):
+    distintos = set(produtos)
+    return [(produto, outro) for produto in distintos for outro in distintos if produto != outro]
+
+
+def atualizar(cursor, pedidos):
+    # Custo proporcional ao quadrado dos itens de cada pedido, não ao histórico
+    contagens = Counter()
+    for df_pedido in pedidos:
+        contagens.update(_pares(df_pedido["Produto"].dropna().astype(str).tolist()))
+    cursor.executemany(_UPSERT, ((produto, outro, n) for (produto, outro), n in contagens.items()))
+
+
+def reconstruir(cursor):
+    # Recalcula a matriz a partir das vendas; usado só para reparo ou migração
+    cursor.execute("DELETE FROM coocorrencias")
+    cursor.execute(
+        "INSERT INTO coocorrencias (produto, outro, pedidos) "
+        'WITH itens AS (SELECT DISTINCT "ID do Pedido" AS pedido, "Produto" AS produto FROM vendas) '
+        "SELECT a.produto, b.produto, COUNT(*) FROM itens a JOIN itens b "
+        "ON a.pedido = b.pedido AND a.produto <> b.produto GROUP BY a.produto, b.produto"
+    )
+
+
+def ler_coocorrencias(conexao, produtos=None):
+    # Linhas da matriz, (produto, outro, pedidos): todas, ou só as dos produtos informados
+    if produtos is None:
+        return conexao.execute("SELECT produto, outro, pedidos FROM coocorrencias").fetchall()
+    produtos = list(produtos)
+    linhas = []
+    for inicio in range(0, len(produtos), LOTE_CONSULTA):
+        lote = produtos[inicio:inicio + LOTE_CONSULTA]
+        linhas.extend(conexao.execute(
+            f"SELECT produto, outro, pedidos FROM coocorrencias WHERE produto IN ({', '.join('?' * len(lote))})",
+            lote,
+        ))
+    return linhas
+
+
+def contar_pares(df_vendas):
+    # Mesma matriz para vendas fora do registro (CSVs antigos e partições)
+    if df_vendas.empty:
+        return pd.DataFrame(columns=COLUNAS_PARES)
+    itens = df_vendas[CHAVE_PEDIDO_ANTIGO + ["Produto"]].astype("string").fillna("").drop_duplicates()
+    itens = pd.DataFrame({
+        "pedido": itens.groupby(CHAVE_PEDIDO_ANTIGO, sort=False).ngroup().to_numpy(),
+        "produto": itens["Produto"].to_numpy(),
+    })
+    pares = itens.merge(itens.rename(columns={"produto": "outro"}), on="pedido")
+    pares = pares[pares["produto"] != pares["outro"]]
+    return pares.groupby(["produto", "outro"], sort=False).size().rename("pedidos").reset_index()
+
+
+def _ordenar(vizinhos, k):
+    # Mais pedidos em comum primeiro; empates pelo nome, para a ordem não variar
+    return tuple(sorted(vizinhos.items(), key=lambda par: (-par[1], par[0]))[:k])
+
+
+class Recomendacoes:
+    def __init__(self, registro, k=TOP_K):
+        self.registro = registro
+        self.k = k
+
+        self._trava = threading.Lock()
+        # produto -> ((outro, pedidos), ...), já ordenado e cortado em k
+        self._sugestoes = {}
+        # produto -> {outro: pedidos} das vendas antigas, somado às linhas do registro
+        self._antigas = {}
+        self._ultimo_pedido = None
+        self._versao_antigas = None
+
+    def atualizar(self, df_antigas, versao_antigas):
+        # Sem pedidos novos nem mudança nas vendas antigas não há nada a refazer
+        ultimo = self.registro.ultimo_pedido()
+        if ultimo == self._ultimo_pedido and versao_antigas == self._versao_antigas:
+            return
+        with self._trava:
+            if versao_antigas != self._versao_antigas:
+                self._reconstruir(df_antigas)
+                self._versao_antigas = versao_antigas
+            elif ultimo != self._ultimo_pedido:
+                self._atualizar_produtos(self.registro.produtos_desde(self._ultimo_pedido))
+            self._ultimo_pedido = ultimo
+
+    def _reconstruir(self, df_antigas):
+        df_antigas = contar_pares(df_antigas)
+        self._antigas = {}
+        for produto, outro, pedidos in zip(*(df_antigas[col].tolist() for col in COLUNAS_PARES)):
+            self._antigas.setdefault(produto, {})[outro] = int(pedidos)
+
+        # O último pedido foi lido antes da matriz: pedidos gravados no meio do
+        # caminho entram de novo na próxima atualização, sem contar em dobro
+        df_pares = pd.DataFrame(self.registro.coocorrencias(), columns=COLUNAS_PARES)
+        df_pares = pd.concat([df_pares, df_antigas], ignore_index=True)
+        df_pares = df_pares.groupby(["produto", "outro"], sort=False)["pedidos"].sum().reset_index()
+        df_pares = df_pares.sort_values(["produto", "pedidos", "outro"], ascending=[True, False, True])
+        df_pares = df_pares.groupby("produto", sort=False).head(self.k)
+
+        sugestoes = {}
+        for produto, outro, pedidos in zip(*(df_pares[col].tolist() for col in COLUNAS_PARES)):
+            sugestoes.setdefault(produto, []).append((outro, int(pedidos)))
+        self._sugestoes = {produto: tuple(vizinhos) for produto, vizinhos in sugestoes.items()}
+
+    def _atualizar_produtos(self, produtos):
+        # Só as linhas dos produtos dos pedidos novos mudaram; são relidas inteiras
+        linhas = {produto: Counter(self._antigas.get(produto, {})) for produto in produtos}
+        for produto, outro, pedidos in self.registro.coocorrencias(produtos):
+            linhas[produto][outro] += pedidos
+        for produto, vizinhos in linhas.items():
+            self._sugestoes[produto] = _ordenar(vizinhos, self.k)
+
+    def sugestoes(self, produto, limite=None):
+        # Leitura de um dicionário pronto: não consulta o registro
+        return self._sugestoes.get(produto, ())[:limite]
+
+
+# Uma tabela de sugestões por registro, compartilhada por todas as sessões do processo
+_recomendacoes = {}
+_trava_recomendacoes = threading.Lock()
+
+
+def abrir_recomendacoes(registro):
+    chave = os.path.abspath(registro.caminho)
+    with _trava_recomendacoes:
+        recomendacoes = _recomendacoes.get(chave)
+        if recomendacoes is None:
+            recomendacoes = Recomendacoes(registro)
+            _recomendacoes[chave] = recomendacoes
+        return recomendacoes
+
+
+def liberar_recomendacoes(caminho_registro):
+    with _trava_recomendacoes:
+        _recomendacoes.pop(os.path.abspath(caminho_registro), None)
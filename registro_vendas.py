@@ -0,0 +1,311 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+import agregados
+import recomendacoes
+
+# Layout das vendas, o mesmo dos antigos venda_*.csv e vendas.csv
+COLUNAS_VENDA = [
+    "Data da Compra",
+    "Nome do Comprador",
+    "Empresa",
+    "Email",
+    "Produto",
+    "Categoria",
+    "Quantidade",
+    "Valor Unitário (R$)",
+    "Valor Total (R$)",
+    "Encargo (%)",
+    "Encargo (R$)",
+]
+
+# Tipos fixos das colunas: vendas de origens diferentes (registro, CSVs antigos,
+# partições compactadas) ficam com o mesmo esquema
+TIPOS_VENDA = {
+    **{col: "string" for col in COLUNAS_VENDA[:6]},
+    "Quantidade": "Int64",
+    **{col: "float64" for col in COLUNAS_VENDA[7:]},
+}
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS pedidos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    "Data da Compra" TEXT NOT NULL,
+    "Nome do Comprador" TEXT,
+    "Empresa" TEXT,
+    "Email" TEXT,
+    "Criado em" TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS vendas (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    "ID do Pedido" INTEGER NOT NULL REFERENCES pedidos(id),
+    "Data da Compra" TEXT NOT NULL,
+    "Nome do Comprador" TEXT,
+    "Empresa" TEXT,
+    "Email" TEXT,
+    "Produto" TEXT NOT NULL,
+    "Categoria" TEXT,
+    "Quantidade" INTEGER NOT NULL,
+    "Valor Unitário (R$)" REAL NOT NULL,
+    "Valor Total (R$)" REAL NOT NULL,
+    "Encargo (%)" REAL NOT NULL,
+    "Encargo (R$)" REAL NOT NULL
+);
+
+-- Consultas por período e paginação da tabela de vendas
+CREATE INDEX IF NOT EXISTS vendas_data ON vendas ("Data da Compra", id);
+
+-- Histórico do comprador: email/empresa -> pedidos -> itens, sem varrer as tabelas
+CREATE INDEX IF NOT EXISTS pedidos_email ON pedidos (lower(trim("Email")), id);
+CREATE INDEX IF NOT EXISTS pedidos_empresa ON pedidos (lower(trim("Empresa")), id);
+CREATE INDEX IF NOT EXISTS vendas_pedido ON vendas ("ID do Pedido");
+
+-- O registro é somente de inclusão: vendas gravadas não podem ser alteradas
+CREATE TRIGGER IF NOT EXISTS vendas_sem_update BEFORE UPDATE ON vendas
+BEGIN
+    SELECT RAISE(ABORT, 'registro de vendas é somente de inclusão');
+END;
+
+CREATE TRIGGER IF NOT EXISTS vendas_sem_delete BEFORE DELETE ON vendas
+BEGIN
+    SELECT RAISE(ABORT, 'registro de vendas é somente de inclusão');
+END;
+"""
+
+
+def _colunas_sql(colunas):
+    return ", ".join(f'"{col}"' for col in colunas)
+
+
+def tipar_vendas(df_vendas):
+    return df_vendas.astype({col: tipo for col, tipo in TIPOS_VENDA.items() if col in df_vendas.columns})
+
+
+def _filtro_vendas(desde=None, ate=None, empresas=None, categorias=None):
+    filtro, parametros = agregados.filtro_periodo('"Data da Compra"', desde, ate)
+    condicoes = []
+    for coluna, valores in (("Empresa", empresas), ("Categoria", categorias)):
+        if valores:
+            condicoes.append(f'"{coluna}" IN ({", ".join("?" * len(valores))})')
+            parametros.extend(valores)
+    if condicoes:
+        filtro += (" AND " if filtro else " WHERE ") + " AND ".join(condicoes)
+    return filtro, parametros
+
+
+class RegistroVendas:
+    def __init__(self, caminho):
+        self.caminho = caminho
+        pasta = os.path.dirname(caminho)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+
+        # Uma conexão por processo; a trava serializa as sessões do Streamlit
+        # e o SQLite (busy_timeout) serializa processos diferentes
+        self._trava = threading.Lock()
+        self._conexao = sqlite3.connect(caminho, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        # Em WAL, NORMAL só faz fsync nos checkpoints: os commits são atômicos
+        # e o custo de fsync é agrupado entre vários pedidos
+        self._conexao.execute("PRAGMA synchronous=NORMAL")
+        self._conexao.execute("PRAGMA busy_timeout=30000")
+        self._conexao.executescript(_ESQUEMA)
+        agregados.criar_tabelas(self._conexao)
+        recomendacoes.criar_tabelas(self._conexao)
+        self._migrar_agregados()
+
+    def _migrar_agregados(self):
+        # Registros criados antes dos agregados: calcula uma única vez
+        with self._trava:
+            cursor = self._conexao.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                sem_totais = cursor.execute("SELECT COUNT(*) FROM agregados_totais").fetchone()[0] == 0
+                com_vendas = cursor.execute("SELECT EXISTS(SELECT 1 FROM vendas)").fetchone()[0] == 1
+                if sem_totais and com_vendas:
+                    agregados.reconstruir(cursor)
+                # Registros criados antes das partições por data
+                tabela_particao = next(iter(agregados.PARTICOES.values()))[0]
+                sem_particoes = cursor.execute(f"SELECT NOT EXISTS(SELECT 1 FROM {tabela_particao})").fetchone()[0] == 1
+                if sem_particoes and com_vendas:
+                    agregados.reconstruir_particoes(cursor)
+                # Registros criados antes da matriz de coocorrência
+                sem_coocorrencias = cursor.execute("SELECT NOT EXISTS(SELECT 1 FROM coocorrencias)").fetchone()[0] == 1
+                if sem_coocorrencias and com_vendas:
+                    recomendacoes.reconstruir(cursor)
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+
+    def registrar_pedido(self, df_pedido):
+        return self.registrar_pedidos([df_pedido])[0]
+
+    def registrar_pedidos(self, pedidos):
+        # Vários pedidos numa única transação (um fsync a menos por pedido)
+        for df_pedido in pedidos:
+            if df_pedido.empty:
+                raise ValueError("Pedido sem itens.")
+            faltando = [col for col in COLUNAS_VENDA if col not in df_pedido.columns]
+            if faltando:
+                raise ValueError(f"Colunas ausentes no pedido: {', '.join(faltando)}")
+
+        criado_em = datetime.now().isoformat(timespec="seconds")
+        ids = []
+        with self._trava:
+            cursor = self._conexao.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                for df_pedido in pedidos:
+                    # Colunas convertidas para listas uma vez; as linhas saem de um zip
+                    colunas = [df_pedido[col].tolist() for col in COLUNAS_VENDA]
+                    cursor.execute(
+                        'INSERT INTO pedidos ("Data da Compra", "Nome do Comprador", "Empresa", "Email", "Criado em") '
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (str(colunas[0][0]), colunas[1][0], colunas[2][0], colunas[3][0], criado_em),
+                    )
+                    id_pedido = cursor.lastrowid
+                    cursor.executemany(
+                        f'INSERT INTO vendas ("ID do Pedido", {_colunas_sql(COLUNAS_VENDA)}) '
+                        f"VALUES (?, {', '.join('?' * len(COLUNAS_VENDA))})",
+                        ((id_pedido, *item) for item in zip(*colunas)),
+                    )
+                    ids.append(id_pedido)
+                agregados.atualizar(cursor, pedidos)
+                recomendacoes.atualizar(cursor, pedidos)
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+        return ids
+
+    def ler_vendas(self):
+        with self._trava:
+            return pd.read_sql_query(
+                f'SELECT "ID do Pedido", {_colunas_sql(COLUNAS_VENDA)} FROM vendas ORDER BY id',
+                self._conexao,
+            )
+
+    def pagina_vendas(self, pagina=0, por_pagina=100, desde=None, ate=None):
+        # Uma página das vendas, mais recentes primeiro; usa o índice por data
+        filtro, parametros = agregados.filtro_periodo('"Data da Compra"', desde, ate)
+        with self._trava:
+            return pd.read_sql_query(
+                f'SELECT "ID do Pedido", {_colunas_sql(COLUNAS_VENDA)} FROM vendas{filtro} '
+                'ORDER BY "Data da Compra" DESC, id DESC LIMIT ? OFFSET ?',
+                self._conexao,
+                params=(*parametros, por_pagina, pagina * por_pagina),
+            )
+
+    def iterar_vendas(self, desde=None, ate=None, empresas=None, categorias=None, tamanho_lote=50_000):
+        # Vendas em lotes, por uma conexão própria e só de leitura: a exportação
+        # não segura a trava do registro e, no WAL, lê um único instante do banco
+        filtro, parametros = _filtro_vendas(desde, ate, empresas, categorias)
+        conexao = sqlite3.connect(f"{Path(self.caminho).resolve().as_uri()}?mode=ro", uri=True, timeout=30)
+        try:
+            conexao.execute("BEGIN")
+            yield from pd.read_sql_query(
+                f'SELECT {_colunas_sql(COLUNAS_VENDA)} FROM vendas{filtro} ORDER BY "Data da Compra", id',
+                conexao,
+                params=parametros,
+                chunksize=tamanho_lote,
+            )
+        finally:
+            conexao.close()
+
+    def pedidos_do_comprador(self, email=None, empresa=None, limite=50):
+        # Pedidos mais recentes do comprador pelos índices de email e empresa
+        # (sem diferenciar maiúsculas nem espaços nas pontas)
+        condicoes, parametros = [], []
+        for coluna, valor in (("Email", email), ("Empresa", empresa)):
+            if valor and valor.strip():
+                condicoes.append(f'lower(trim(p."{coluna}")) = ?')
+                parametros.append(valor.strip().lower())
+        if not condicoes:
+            raise ValueError("Informe o email ou a empresa do comprador.")
+        with self._trava:
+            return pd.read_sql_query(
+                'SELECT p.id AS "ID do Pedido", p."Data da Compra", p."Nome do Comprador", p."Empresa", p."Email", '
+                'COUNT(*) AS "Itens", SUM(v."Quantidade") AS "Quantidade", '
+                'ROUND(SUM(v."Valor Total (R$)"), 2) AS "Valor Total (R$)" '
+                'FROM pedidos p JOIN vendas v ON v."ID do Pedido" = p.id '
+                f'WHERE {" AND ".join(condicoes)} GROUP BY p.id ORDER BY p.id DESC LIMIT ?',
+                self._conexao,
+                params=(*parametros, limite),
+            )
+
+    def itens_pedido(self, id_pedido):
+        with self._trava:
+            return pd.read_sql_query(
+                f'SELECT {_colunas_sql(COLUNAS_VENDA)} FROM vendas WHERE "ID do Pedido" = ? ORDER BY id',
+                self._conexao,
+                params=(int(id_pedido),),
+            )
+
+    def ultimo_pedido(self):
+        with self._trava:
+            return self._conexao.execute("SELECT COALESCE(MAX(id), 0) FROM pedidos").fetchone()[0]
+
+    def produtos_desde(self, id_pedido):
+        # Produtos dos pedidos gravados depois de id_pedido, pelo índice vendas_pedido
+        with self._trava:
+            return [
+                produto for (produto,) in self._conexao.execute(
+                    'SELECT DISTINCT "Produto" FROM vendas WHERE "ID do Pedido" > ?', (id_pedido,)
+                )
+            ]
+
+    def coocorrencias(self, produtos=None):
+        with self._trava:
+            return recomendacoes.ler_coocorrencias(self._conexao, produtos)
+
+    def totais(self):
+        with self._trava:
+            return agregados.ler_totais(self._conexao)
+
+    def agregado_por(self, dimensao):
+        with self._trava:
+            return agregados.ler_dimensao(self._conexao, dimensao)
+
+    def serie(self, desde=None, ate=None):
+        with self._trava:
+            return agregados.ler_serie(self._conexao, desde, ate)
+
+    def periodo(self, dimensao, desde=None, ate=None):
+        with self._trava:
+            return agregados.ler_periodo(self._conexao, dimensao, desde, ate)
+
+    def contar_vendas(self, desde=None, ate=None):
+        filtro, parametros = agregados.filtro_periodo('"Data da Compra"', desde, ate)
+        with self._trava:
+            return self._conexao.execute(f"SELECT COUNT(*) FROM vendas{filtro}", parametros).fetchone()[0]
+
+    def sincronizar(self):
+        # Força o fsync pendente levando o WAL para o arquivo principal
+        with self._trava:
+            self._conexao.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def fechar(self):
+        with self._trava:
+            self._conexao.close()
+
+
+# Um registro por arquivo, compartilhado por todas as sessões do processo
+_registros = {}
+_trava_registros = threading.Lock()
+
+
+def abrir_registro(caminho):
+    chave = os.path.abspath(caminho)
+    with _trava_registros:
+        registro = _registros.get(chave)
+        if registro is None:
+            registro = RegistroVendas(chave)
+            _registros[chave] = registro
+        return registro
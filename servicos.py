@@ -0,0 +1,184 @@
+import os
+import threading
+import uuid
+
+import streamlit as st
+
+from fornecedores import PARAMETRO_URL, carregar_fornecedores
+from instrumentacao import Medicao, Metricas, iniciar_servidor, memoria_por_padrao, obter_metricas
+
+# Dados compartilhados pelas páginas do app. Cada serviço é aberto uma vez por
+# processo e fornecedor e reaproveitado por todas as sessões e páginas; os
+# módulos pesados só são importados quando a primeira página que precisa deles
+# é aberta. Os caminhos dos arquivos vêm do fornecedor da sessão (fornecedores.py).
+
+
+def obter_fornecedor():
+    # Fornecedor da sessão: ?fornecedor=<chave> na URL, mantido ao trocar de página
+    fornecedores = carregar_fornecedores()
+    chave = st.query_params.get(PARAMETRO_URL)
+    if chave is not None:
+        fornecedores.obter(chave)
+        st.session_state.fornecedor = chave
+    fornecedor = fornecedores.obter(st.session_state.get("fornecedor"))
+
+    ociosos = fornecedores.registrar_acesso(fornecedor)
+    if ociosos:
+        liberar_fornecedores(ociosos, fornecedores.ativos())
+    return fornecedor
+
+
+def liberar_fornecedores(ociosos, ativos):
+    # Solta os caches de leitura (catálogo, vendas antigas, sugestões) dos
+    # fornecedores ociosos, menos os arquivos que um fornecedor ativo também usa.
+    # As conexões do registro e do estoque são pequenas e continuam abertas
+    from carregador_vendas import liberar_carregador
+    from catalogo import liberar_catalogo
+    from recomendacoes import liberar_recomendacoes
+
+    em_uso = {
+        os.path.abspath(caminho)
+        for fornecedor in ativos
+        for caminho in (fornecedor.produtos_path, fornecedor.vendas_dir)
+    }
+    for fornecedor in ociosos:
+        if os.path.abspath(fornecedor.produtos_path) not in em_uso:
+            liberar_catalogo(fornecedor.produtos_path)
+        if os.path.abspath(fornecedor.vendas_dir) not in em_uso:
+            liberar_carregador(fornecedor.vendas_dir)
+            liberar_recomendacoes(fornecedor.vendas_db_path)
+            with _trava_resumos:
+                _resumos.pop(os.path.abspath(fornecedor.vendas_dir), None)
+                _listagens.pop(os.path.abspath(fornecedor.vendas_dir), None)
+
+
+def obter_catalogo():
+    from catalogo import carregar_catalogo
+
+    return carregar_catalogo(obter_fornecedor().produtos_path)
+
+
+def obter_estoque():
+    from estoque import abrir_estoque
+
+    return abrir_estoque(obter_fornecedor().estoque_db_path)
+
+
+def obter_registro():
+    from registro_vendas import abrir_registro
+
+    fornecedor = obter_fornecedor()
+    os.makedirs(fornecedor.vendas_dir, exist_ok=True)
+    return abrir_registro(fornecedor.vendas_db_path)
+
+
+# Vendas antigas (venda_*.csv e vendas.csv) resumidas uma vez por versão dos arquivos
+_resumos = {}
+_trava_resumos = threading.Lock()
+
+
+def obter_vendas_antigas():
+    import agregados
+    from carregador_vendas import obter_carregador
+
+    carregador = obter_carregador(obter_fornecedor().vendas_dir)
+    df_vendas, versao = carregador.carregar()
+    with _trava_resumos:
+        resumo = _resumos.get(carregador.pasta)
+        if resumo is None or resumo[0] != versao:
+            resumo = (versao, agregados.resumir(df_vendas))
+            _resumos[carregador.pasta] = resumo
+        return resumo[1]
+
+
+def descartes_vendas_antigas():
+    # O que a última carga das vendas antigas deixou de fora: arquivos ilegíveis
+    # (caminho -> erro) e quantas linhas tinham valores inconsistentes
+    from carregador_vendas import obter_carregador
+
+    carregador = obter_carregador(obter_fornecedor().vendas_dir)
+    return carregador.ilegiveis, carregador.descartadas
+
+
+def ler_vendas_antigas():
+    from carregador_vendas import obter_carregador
+
+    return obter_carregador(obter_fornecedor().vendas_dir).carregar()[0]
+
+
+# Vendas antigas em ordem de listagem (mais recentes primeiro), uma vez por versão dos arquivos
+_listagens = {}
+
+
+def listar_vendas_antigas():
+    # Devolve as vendas ordenadas e o dia (AAAA-MM-DD) de cada uma; como a ordem
+    # é decrescente, as vendas desde um dia formam o começo da tabela
+    from carregador_vendas import obter_carregador
+
+    carregador = obter_carregador(obter_fornecedor().vendas_dir)
+    df_vendas, versao = carregador.carregar()
+    with _trava_resumos:
+        listagem = _listagens.get(carregador.pasta)
+        if listagem is None or listagem[0] != versao:
+            dias = df_vendas["Data da Compra"].astype("string").str.strip().str[:10].fillna("")
+            ordem = dias.sort_values(ascending=False, kind="stable").index
+            listagem = (
+                versao,
+                df_vendas.loc[ordem].reset_index(drop=True),
+                dias.loc[ordem].to_numpy(dtype=object),
+            )
+            _listagens[carregador.pasta] = listagem
+        return listagem[1], listagem[2]
+
+
+def obter_recomendacoes():
+    # Sugestões "comprados juntos" do registro e das vendas antigas; a atualização
+    # só refaz algo quando chegam pedidos novos ou os arquivos antigos mudam.
+    # A pasta das vendas antigas é relistada no máximo a cada INTERVALO_VENDAS_ANTIGAS:
+    # no rerun comum sobram a consulta do último pedido e a leitura do dicionário
+    from carregador_vendas import obter_carregador
+    from recomendacoes import INTERVALO_VENDAS_ANTIGAS, abrir_recomendacoes
+
+    carregador = obter_carregador(obter_fornecedor().vendas_dir)
+    df_vendas, versao = carregador.carregar(idade_maxima=INTERVALO_VENDAS_ANTIGAS)
+    recomendacoes = abrir_recomendacoes(obter_registro())
+    recomendacoes.atualizar(df_vendas, versao)
+    return recomendacoes
+
+
+def obter_carrinho():
+    from carrinho import Carrinho
+
+    # Um carrinho por fornecedor: os produtos e preços são do catálogo dele
+    chave = f"carrinho_{obter_fornecedor().chave}"
+    if chave not in st.session_state:
+        st.session_state[chave] = Carrinho()
+    return st.session_state[chave]
+
+
+def obter_id_sessao():
+    # Identifica as reservas de estoque desta sessão
+    if "id_sessao" not in st.session_state:
+        st.session_state.id_sessao = uuid.uuid4().hex
+    return st.session_state.id_sessao
+
+
+def iniciar_medicao():
+    # Medição das etapas deste rerun, somada no processo e na sessão (painel com ?debug=1).
+    # O tracemalloc vale para o processo inteiro: só liga pela configuração, nunca pela URL
+    if "metricas_sessao" not in st.session_state:
+        st.session_state.metricas_sessao = Metricas()
+    iniciar_servidor()
+    return Medicao(obter_metricas(), st.session_state.metricas_sessao, memoria=memoria_por_padrao())
+
+
+def concluir_medicao(medicao, id_sessao=None):
+    # Painel de depuração: etapas deste rerun e acumulado da sessão
+    if st.query_params.get("debug") == "1":
+        with st.sidebar.expander("🔧 Desempenho", expanded=True):
+            st.caption("Memória e E/S são do processo inteiro, não só desta sessão.")
+            st.caption("Este rerun")
+            st.dataframe(medicao.tabela())
+            st.caption("Sessão")
+            st.dataframe(st.session_state.metricas_sessao.tabela())
+    medicao.concluir(id_sessao)